@@ -0,0 +1,73 @@
+"""
+Append-only log of graded attempts, the input for offline analytics.
+
+One NDJSON line per "Check" press, rotated daily:
+
+    attempt_logs/attempts-2026-10-19.ndjson
+    {"ts": 1792368000.12, "learner": "alice", "bank": "core", "qnum": 10, "selected": "BD", "ok": false}
+
+`selected` is the chosen letters in order A-F ("" for no answer).
+
+Mock exam results go to exams-<date>.ndjson in the same directory, one
+line per submitted exam (score, time taken, per-topic breakdown).
+"""
+
+import json
+import time
+import threading
+from pathlib import Path
+from typing import Iterator, List
+
+
+def attempt_record(learner: str, bank: str, qnum: int, selected: List[str], ok: bool) -> dict:
+    return {
+        "ts": round(time.time(), 3),
+        "learner": learner,
+        "bank": bank,
+        "qnum": int(qnum),
+        "selected": "".join(sorted(set(selected))),
+        "ok": bool(ok),
+    }
+
+
+class AttemptLog:
+    """Thread-safe appender; each batch of records is a single write per file."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def path_for(self, ts: float, kind: str = "attempts") -> Path:
+        return self.root / time.strftime(f"{kind}-%Y-%m-%d.ndjson", time.gmtime(ts))
+
+    def _write(self, records: List[dict], kind: str):
+        by_path = {}
+        for record in records:
+            line = json.dumps(record, separators=(",", ":")) + "\n"
+            by_path.setdefault(self.path_for(record["ts"], kind), []).append(line)
+        with self._lock:
+            for path, lines in by_path.items():
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write("".join(lines))
+
+    def append(self, learner: str, bank: str, qnum: int, selected: List[str], ok: bool):
+        self._write([attempt_record(learner, bank, qnum, selected, ok)], "attempts")
+
+    def extend(self, records: List[dict]):
+        """Log many attempt records (see attempt_record) at once."""
+        self._write(records, "attempts")
+
+    def append_exam(self, learner: str, bank: str, result: dict):
+        """Log a graded mock exam (see mock_exam.ExamBlueprint.grade)."""
+        self._write([dict(result, ts=round(time.time(), 3), learner=learner, bank=bank)], "exams")
+
+
+def iter_attempts(root, kind: str = "attempts") -> Iterator[dict]:
+    """Yield records from every log file of a kind under root, oldest file first."""
+    for path in sorted(Path(root).glob(f"{kind}-*.ndjson")):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
@@ -0,0 +1,156 @@
+"""
+Registry of question banks served by one app process.
+
+Banks are listed in banks.json and loaded lazily the first time a learner
+selects them. Loaded banks live in an LRU cache with a memory budget:
+when the budget is exceeded, the least recently used banks are evicted,
+and banks nobody has touched for `idle_seconds` are dropped on the next
+access. A bank whose file changed on disk is reloaded on its next use
+(the file is checked at most every `recheck_seconds`, default: every use).
+
+Objects built from a bank (cards, exam blueprints, ...) can be kept on
+its cache entry with derived(); they are dropped along with the DataFrame
+they were built from, so they can never outlive or mismatch it.
+
+    registry = BankRegistry.from_config("banks.json", loader=load_bank, version_fn=bank_version)
+    df = registry.get("core")
+    cards = registry.derived("core", df, "cards", build_cards)
+"""
+
+import json
+import time
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_BANKS = [
+    {"id": "core", "title": "SnowPro Core", "path": "snowpro_questions.json"},
+]
+DEFAULT_BUDGET_MB = 512
+DEFAULT_IDLE_MINUTES = 30
+
+
+def frame_nbytes(df) -> int:
+    """Approximate in-memory size of a DataFrame, including string payloads."""
+    return int(df.memory_usage(deep=True).sum())
+
+
+class BankRegistry:
+    """Lazily loaded, LRU-evicted banks keyed by bank id. Thread-safe."""
+
+    def __init__(self, banks: List[Dict], loader: Callable, version_fn: Callable,
+                 budget_bytes: int = DEFAULT_BUDGET_MB << 20,
+                 idle_seconds: float = DEFAULT_IDLE_MINUTES * 60,
+                 size_fn: Callable = frame_nbytes, recheck_seconds: float = 0):
+        self.banks = OrderedDict((b["id"], b) for b in banks)
+        self.loader = loader          # (bank config, version) -> DataFrame
+        self.version_fn = version_fn  # bank config -> cache key (path, mtime, size)
+        self.budget_bytes = budget_bytes
+        self.idle_seconds = idle_seconds
+        self.size_fn = size_fn
+        self.recheck_seconds = recheck_seconds
+        self._cache = OrderedDict()   # bank id -> (version, df, nbytes, last_used, derived)
+        self._checked = {}            # bank id -> when its version was last read
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "loads": 0, "evictions": 0}
+
+    @classmethod
+    def from_config(cls, path: Path, loader: Callable, version_fn: Callable, **kwargs) -> "BankRegistry":
+        """Build a registry from banks.json; falls back to the Core bank alone."""
+        config = {}
+        if Path(path).exists():
+            with open(path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+        base = Path(path).parent
+        banks = [dict(b, path=str(base / b["path"])) for b in config.get("banks", DEFAULT_BANKS)]
+        return cls(
+            banks, loader, version_fn,
+            budget_bytes=int(config.get("memory_budget_mb", DEFAULT_BUDGET_MB)) << 20,
+            idle_seconds=float(config.get("idle_minutes", DEFAULT_IDLE_MINUTES)) * 60,
+            **kwargs,
+        )
+
+    def titles(self) -> Dict[str, str]:
+        return {bid: b.get("title", bid) for bid, b in self.banks.items()}
+
+    def get(self, bank_id: str):
+        """Return the DataFrame for bank_id, loading it if needed."""
+        bank = self.banks[bank_id]
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._cache.get(bank_id)
+            # Serve the cached copy without touching the disk for a while
+            if entry and now - self._checked.get(bank_id, float("-inf")) < self.recheck_seconds:
+                return self._hit(bank_id, entry, now)
+        version = self.version_fn(bank)
+        with self._lock:
+            self._checked[bank_id] = now
+            entry = self._cache.get(bank_id)
+            if entry and entry[0] == version:
+                return self._hit(bank_id, entry, now)
+
+        # Load outside the lock so other banks stay servable meanwhile
+        df = self.loader(bank, version)
+        nbytes = self.size_fn(df)
+        with self._lock:
+            self._cache[bank_id] = (version, df, nbytes, now, {})
+            self._cache.move_to_end(bank_id)
+            self.stats["loads"] += 1
+            self._evict_over_budget(keep=bank_id)
+        return df
+
+    def derived(self, bank_id: str, df, name: str, build: Callable):
+        """build(df), kept on the bank's cache entry while df is the DataFrame cached there.
+
+        df is the frame the caller got from get(); if the bank has been
+        reloaded or evicted since, the result is built but not kept.
+        """
+        with self._lock:
+            entry = self._cache.get(bank_id)
+            if entry is not None and entry[1] is df and name in entry[4]:
+                return entry[4][name]
+        value = build(df)
+        with self._lock:
+            entry = self._cache.get(bank_id)
+            if entry is not None and entry[1] is df:
+                value = entry[4].setdefault(name, value)
+        return value
+
+    def _hit(self, bank_id: str, entry: Tuple, now: float):
+        self._cache[bank_id] = (entry[0], entry[1], entry[2], now, entry[4])
+        self._cache.move_to_end(bank_id)
+        self.stats["hits"] += 1
+        return entry[1]
+
+    def resident(self) -> List[Tuple[str, int]]:
+        """(bank id, bytes) of loaded banks, least recently used first."""
+        with self._lock:
+            return [(bid, e[2]) for bid, e in self._cache.items()]
+
+    def resident_bytes(self) -> int:
+        return sum(n for _, n in self.resident())
+
+    def evict(self, bank_id: Optional[str] = None):
+        """Drop one bank (or all) from memory."""
+        with self._lock:
+            if bank_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(bank_id, None)
+
+    def _evict_idle(self, now: float):
+        for bid in [b for b, e in self._cache.items() if now - e[3] > self.idle_seconds]:
+            del self._cache[bid]
+            self.stats["evictions"] += 1
+
+    def _evict_over_budget(self, keep: str):
+        total = sum(e[2] for e in self._cache.values())
+        for bid in list(self._cache):
+            if total <= self.budget_bytes:
+                break
+            if bid == keep:
+                continue
+            total -= self._cache.pop(bid)[2]
+            self.stats["evictions"] += 1
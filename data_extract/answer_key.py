@@ -0,0 +1,125 @@
+"""
+Single-pass answer-key indexer with conflict reporting.
+
+Locates the "Answers" section once and walks its "q<number> <letters>"
+entries linearly, so the rest of the document is never rescanned.
+Instead of letting later entries silently overwrite earlier ones, every
+anomaly is collected into a diagnostics dict:
+
+    duplicates  qnums listed more than once with the same letters
+    conflicts   {qnum: [letters, letters, ...]} listed with different letters
+    unparsed    {qnum: raw text} entries with no usable letters (e.g. "q92 ?")
+    missing     qnums in 1..max that never got a usable answer
+
+Usage:
+    python answer_key.py [snowpro_raw.txt]
+"""
+
+import re
+import sys
+import json
+from pathlib import Path
+
+
+# A line consisting only of "Answers" marks the start of the key
+ANSWERS_HEADER = re.compile(r'^[ \t]*Answers[ \t]*$', re.MULTILINE)
+
+# "q32 abd", "q268 b - <url>", "q92 ? - ..." -- several may share a line
+ANSWER_ENTRY = re.compile(r'\bq(\d+)\b[ \t]*(?:([a-f]+)\b)?([^\n]*?)(?=\bq\d+\b|\n|\Z)',
+                          re.IGNORECASE)
+
+
+def find_answer_section(text):
+    """Return the offset where the answer key body starts, or -1."""
+    # The key sits at the end of the dump; take the last header so a
+    # question that happens to mention "Answers" on its own line is skipped
+    start = -1
+    for match in ANSWERS_HEADER.finditer(text):
+        start = match.end()
+    return start
+
+
+def index_answer_key(text, expected_max=None):
+    """Parse the answer key in one pass.
+
+    Returns (answers, diagnostics). answers maps qnum -> list of upper-case
+    letters; the first usable entry for a qnum wins.
+    """
+    answers = {}
+    diagnostics = {
+        "section_found": False,
+        "entries": 0,
+        "duplicates": [],
+        "conflicts": {},
+        "unparsed": {},
+        "missing": [],
+    }
+
+    start = find_answer_section(text)
+    if start < 0:
+        return answers, diagnostics
+    diagnostics["section_found"] = True
+
+    seen_max = 0
+    for match in ANSWER_ENTRY.finditer(text, start):
+        qnum = int(match.group(1))
+        seen_max = max(seen_max, qnum)
+        diagnostics["entries"] += 1
+
+        if not match.group(2):
+            raw = (match.group(3) or '').strip()
+            diagnostics["unparsed"].setdefault(qnum, raw)
+            continue
+
+        letters = [c.upper() for c in match.group(2)]
+        if qnum not in answers:
+            answers[qnum] = letters
+        elif answers[qnum] == letters:
+            diagnostics["duplicates"].append(qnum)
+        else:
+            diagnostics["conflicts"].setdefault(qnum, [answers[qnum]]).append(letters)
+
+    upper = expected_max if expected_max is not None else seen_max
+    diagnostics["missing"] = [q for q in range(1, upper + 1) if q not in answers]
+
+    return answers, diagnostics
+
+
+def print_diagnostics(diagnostics):
+    """Print a short human-readable summary of the indexer diagnostics."""
+    if not diagnostics["section_found"]:
+        print("  Warning: Could not find Answers section")
+        return
+    print(f"  Answer entries: {diagnostics['entries']}")
+    if diagnostics["duplicates"]:
+        print(f"  Duplicates: {diagnostics['duplicates']}")
+    for qnum, variants in diagnostics["conflicts"].items():
+        shown = ' vs '.join(''.join(v) for v in variants)
+        print(f"  Conflict Q{qnum}: {shown} (kept {''.join(variants[0])})")
+    for qnum, raw in diagnostics["unparsed"].items():
+        print(f"  Unparsed Q{qnum}: {raw!r}")
+    if diagnostics["missing"]:
+        print(f"  Missing answers for: {diagnostics['missing']}")
+
+
+def main():
+    """Index the answer key and dump diagnostics as JSON."""
+
+    text_file = Path(sys.argv[1] if len(sys.argv) > 1 else "snowpro_raw.txt")
+
+    if not text_file.exists():
+        print(f"Error: {text_file} not found!")
+        return
+
+    with open(text_file, 'r', encoding='utf-8', errors='ignore') as f:
+        text = f.read()
+
+    answers, diagnostics = index_answer_key(text)
+    print(f"Found {len(answers)} answers")
+    print_diagnostics(diagnostics)
+    print()
+    print(json.dumps(diagnostics, indent=2))
+
+
+if __name__ == "__main__":
+    main()
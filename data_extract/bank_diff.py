@@ -0,0 +1,148 @@
+"""
+Content-hash diff between two question bank artifacts.
+
+Every record is reduced to a canonical form (whitespace-normalized text,
+options A-F, sorted answer letters) and hashed per field. The first bank
+is streamed into a qnum -> digests index, the second is streamed against
+it, so only digests are held in memory and each file is read once.
+
+Exit status is 0 when the banks agree and 1 otherwise, so it can be used
+as a pre-deploy gate:
+
+    python bank_diff.py ../snowpro_questions.json snowpro_questions.csv
+    python bank_diff.py old.json new.ndjson --compiled   # compare after compile_bank repairs
+    python bank_diff.py a.json b.json --json diff.json
+"""
+
+import sys
+import json
+import hashlib
+import argparse
+from pathlib import Path
+
+from bank_io import iter_bank
+
+
+OPTION_LABELS = "ABCDEF"
+FIELDS = ["question"] + list(OPTION_LABELS) + ["correct"]
+
+
+def canonical_record(q):
+    """Field values in the form used for hashing and comparison."""
+    record = {"question": " ".join(str(q.get("question") or "").split())}
+    for lab in OPTION_LABELS:
+        record[lab] = " ".join(str(q.get(lab) or "").split())
+    correct = q.get("correct") or []
+    if isinstance(correct, str):
+        correct = list(correct)
+    record["correct"] = sorted({str(c).strip().upper() for c in correct if str(c).strip()})
+    return record
+
+
+def _digest(value):
+    data = json.dumps(value, ensure_ascii=False, sort_keys=True).encode('utf-8')
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def field_hashes(q):
+    """Per-field digests of the canonical record."""
+    record = canonical_record(q)
+    return {f: _digest(record[f]) for f in FIELDS}
+
+
+def record_hash(q):
+    """Single digest for the whole canonical record."""
+    return _digest(field_hashes(q))
+
+
+def diff_banks(old_questions, new_questions):
+    """Keyed diff of two question iterables (each consumed once).
+
+    Returns {"added": [qnum], "removed": [qnum], "changed": {qnum: [field]},
+    "unchanged": count, "duplicates": {"old": [qnum], "new": [qnum]}}.
+    """
+    old_index = {}
+    dup_old = []
+    for q in old_questions:
+        qnum = int(q["qnum"])
+        if qnum in old_index:
+            dup_old.append(qnum)
+            continue
+        fields = field_hashes(q)
+        old_index[qnum] = (_digest(fields), fields)
+
+    added, changed, dup_new = [], {}, []
+    unchanged = 0
+    seen = set()
+    for q in new_questions:
+        qnum = int(q["qnum"])
+        if qnum in seen:
+            dup_new.append(qnum)
+            continue
+        seen.add(qnum)
+        fields = field_hashes(q)
+        old = old_index.get(qnum)
+        if old is None:
+            added.append(qnum)
+        elif old[0] == _digest(fields):
+            unchanged += 1
+        else:
+            changed[qnum] = [f for f in FIELDS if old[1][f] != fields[f]]
+
+    removed = sorted(q for q in old_index if q not in seen)
+    return {
+        "added": sorted(added),
+        "removed": removed,
+        "changed": dict(sorted(changed.items())),
+        "unchanged": unchanged,
+        "duplicates": {"old": dup_old, "new": dup_new},
+    }
+
+
+def is_clean(diff):
+    return not (diff["added"] or diff["removed"] or diff["changed"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff two question bank artifacts by content hash.")
+    parser.add_argument("old", type=Path)
+    parser.add_argument("new", type=Path)
+    parser.add_argument("--compiled", action="store_true",
+                        help="apply compile_bank repairs to both sides before comparing")
+    parser.add_argument("--json", type=Path, help="write the diff as JSON")
+    args = parser.parse_args()
+
+    for path in (args.old, args.new):
+        if not path.exists():
+            print(f"Error: {path} not found!")
+            sys.exit(2)
+
+    old_q, new_q = iter_bank(args.old), iter_bank(args.new)
+    if args.compiled:
+        from compile_bank import compile_question
+        old_q = (compile_question(q) for q in old_q)
+        new_q = (compile_question(q) for q in new_q)
+
+    diff = diff_banks(old_q, new_q)
+
+    print(f"{args.old.name} -> {args.new.name}")
+    print(f"  unchanged: {diff['unchanged']}")
+    print(f"  added:     {len(diff['added'])} {diff['added'][:20]}")
+    print(f"  removed:   {len(diff['removed'])} {diff['removed'][:20]}")
+    print(f"  changed:   {len(diff['changed'])}")
+    for qnum, fields in list(diff["changed"].items())[:50]:
+        print(f"    Q{qnum}: {', '.join(fields)}")
+    for side in ("old", "new"):
+        if diff["duplicates"][side]:
+            print(f"  duplicate qnums in {side}: {diff['duplicates'][side]}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(diff, f, indent=2)
+        print(f"\nSaved diff to {args.json}")
+
+    sys.exit(0 if is_clean(diff) else 1)
+
+
+if __name__ == "__main__":
+    main()
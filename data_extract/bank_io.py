@@ -0,0 +1,282 @@
+"""
+Streaming reader/writer for question bank files.
+
+Supported formats (picked from the file name):
+    *.json              a single JSON array (the original format)
+    *.ndjson / *.jsonl  one question object per line
+    *.csv               spreadsheet export (read-only)
+    + .gz / .bz2 / .xz  optional compression on top of either
+
+A bank may carry a metadata header (schema version, source hash, ...):
+JSON banks then become {"schema_version": ..., "questions": [...]} and
+line-delimited banks start with a {"_meta": {...}} line. iter_bank() skips
+the header, read_bank_meta() returns it alongside the questions and
+read_bank_header() returns it alone.
+
+Writes always go to a temporary file next to the target and are moved into
+place with os.replace() once complete, so a crash mid-write leaves the
+previous file untouched.
+
+Usage:
+    python bank_io.py <src> <dst>      # convert between formats
+"""
+
+import os
+import ast
+import bz2
+import csv
+import sys
+import gzip
+import json
+import lzma
+import tempfile
+from pathlib import Path
+
+
+COMPRESSORS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+
+LINE_FORMATS = ('.ndjson', '.jsonl')
+
+# Bumped whenever compile_bank changes the shape of compiled records
+BANK_SCHEMA_VERSION = 2
+
+
+def _split_suffix(path):
+    """Return (format suffix, compression suffix or None) for a bank path."""
+    suffixes = [s.lower() for s in Path(path).suffixes]
+    compression = suffixes[-1] if suffixes and suffixes[-1] in COMPRESSORS else None
+    if compression:
+        suffixes = suffixes[:-1]
+    fmt = suffixes[-1] if suffixes else ''
+    return fmt, compression
+
+
+def _open_text(path, mode, compression, newline=None):
+    if compression:
+        return COMPRESSORS[compression](path, mode + 't', encoding='utf-8', newline=newline)
+    return open(path, mode, encoding='utf-8', newline=newline)
+
+
+def is_line_format(path):
+    """True if the path names a line-delimited bank."""
+    return _split_suffix(path)[0] in LINE_FORMATS
+
+
+def _csv_record(row):
+    """Convert a CSV row back to a question dict (correct is "['A', 'B']")."""
+    record = dict(row)
+    for key in ("qnum", "n_choices"):
+        if record.get(key):
+            record[key] = int(record[key])
+    correct = (record.get("correct") or "").strip()
+    if not correct or correct == "None":
+        record["correct"] = None
+    elif correct.startswith("["):
+        record["correct"] = [str(c) for c in ast.literal_eval(correct)]
+    else:
+        record["correct"] = [c for c in correct.upper() if c.isalpha()]
+    return record
+
+
+def _iter_records(path):
+    """Yield ("meta", dict) for a header and ("q", dict) for each question."""
+    fmt, compression = _split_suffix(path)
+    # The csv module does its own line splitting; quoted fields may hold newlines
+    newline = '' if fmt == '.csv' else None
+    with _open_text(path, 'r', compression, newline) as f:
+        if fmt == '.csv':
+            for row in csv.DictReader(f):
+                yield "q", _csv_record(row)
+        elif fmt in LINE_FORMATS:
+            for lineno, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}:{lineno}: invalid record: {e}") from e
+                if "_meta" in record:
+                    yield "meta", record["_meta"]
+                else:
+                    yield "q", record
+        else:
+            data = json.load(f)
+            if isinstance(data, dict):
+                yield "meta", {k: v for k, v in data.items() if k != "questions"}
+                data = data.get("questions", [])
+            for record in data:
+                yield "q", record
+
+
+def iter_bank(path):
+    """Yield question dicts from a bank file.
+
+    Line-delimited banks are streamed one record at a time; JSON arrays are
+    loaded whole since the format cannot be read incrementally.
+    """
+    for kind, record in _iter_records(path):
+        if kind == "q":
+            yield record
+
+
+def read_bank(path):
+    """Load a whole bank into a list of question dicts."""
+    return list(iter_bank(path))
+
+
+def read_bank_meta(path):
+    """Load a bank and its metadata header; returns (meta, questions)."""
+    meta, questions = {}, []
+    for kind, record in _iter_records(path):
+        if kind == "meta":
+            meta = record
+        else:
+            questions.append(record)
+    return meta, questions
+
+
+def read_bank_header(path, limit=1 << 16):
+    """Return a bank's metadata header ({} if none) without reading its questions.
+
+    Only works for headers written by BankWriter, which puts every header
+    key ahead of "questions" in JSON banks.
+    """
+    fmt, compression = _split_suffix(path)
+    if fmt == '.csv':
+        return {}
+    with _open_text(path, 'r', compression) as f:
+        if fmt in LINE_FORMATS:
+            line = f.readline().strip()
+            try:
+                record = json.loads(line) if line else {}
+            except json.JSONDecodeError:
+                return {}
+            return record.get("_meta", {}) if isinstance(record, dict) else {}
+        head = f.read(limit)
+    end = head.find('"questions": [')
+    if not head.lstrip().startswith('{') or end < 0:
+        return {}
+    try:
+        meta = json.loads(head[:end] + '"questions": []}')
+    except json.JSONDecodeError:
+        return {}
+    meta.pop("questions")
+    return meta
+
+
+class BankWriter:
+    """Append questions to a bank as they are produced.
+
+    Use as a context manager; the target only appears (or is replaced)
+    when the block exits without an exception.
+
+        with BankWriter("snowpro_questions.ndjson.gz") as w:
+            for q in questions:
+                w.write(q)
+    """
+
+    def __init__(self, path, indent=2, meta=None):
+        self.path = Path(path)
+        self.indent = indent
+        self.meta = meta
+        self.count = 0
+        self._fmt, self._compression = _split_suffix(self.path)
+        if self._fmt == '.csv':
+            raise ValueError(f"{self.path}: CSV banks are read-only")
+        self._tmp_path = None
+        self._f = None
+
+    def __enter__(self):
+        fd, tmp = tempfile.mkstemp(prefix=f".{self.path.name}.", suffix=".tmp",
+                                   dir=self.path.parent)
+        os.close(fd)
+        self._tmp_path = Path(tmp)
+        # mkstemp creates 0600 files; keep the mode the target already has
+        mode = self.path.stat().st_mode & 0o777 if self.path.exists() else 0o644
+        os.chmod(self._tmp_path, mode)
+        self._f = _open_text(self._tmp_path, 'w', self._compression)
+        if self.is_lines:
+            if self.meta is not None:
+                self._f.write(json.dumps({"_meta": self.meta}, ensure_ascii=False) + '\n')
+        else:
+            if self.meta is not None:
+                header = json.dumps({**self.meta, "questions": []}, ensure_ascii=False)
+                self._f.write(header[:-3])
+            self._f.write('[')
+        return self
+
+    @property
+    def is_lines(self):
+        return self._fmt in LINE_FORMATS
+
+    def write(self, question):
+        """Append one question record."""
+        if self.is_lines:
+            self._f.write(json.dumps(question, ensure_ascii=False))
+            self._f.write('\n')
+        else:
+            body = json.dumps(question, indent=self.indent, ensure_ascii=False)
+            if self.indent:
+                pad = ' ' * self.indent
+                body = pad + body.replace('\n', '\n' + pad)
+                self._f.write(',\n' if self.count else '\n')
+            else:
+                self._f.write(', ' if self.count else '')
+            self._f.write(body)
+        self.count += 1
+
+    def write_all(self, questions):
+        for q in questions:
+            self.write(q)
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                if not self.is_lines:
+                    self._f.write('\n]' if self.count and self.indent else ']')
+                    if self.meta is not None:
+                        self._f.write('}')
+                self._f.flush()
+                if not self._compression:
+                    os.fsync(self._f.fileno())
+            self._f.close()
+            if exc_type is None:
+                os.replace(self._tmp_path, self.path)
+        finally:
+            if self._tmp_path.exists():
+                self._tmp_path.unlink()
+        return False
+
+
+def write_bank(path, questions, indent=2, meta=None):
+    """Atomically write a full list of questions to path."""
+    with BankWriter(path, indent=indent, meta=meta) as writer:
+        writer.write_all(questions)
+    return writer.count
+
+
+def main():
+    """Convert a bank from one format to another."""
+    if len(sys.argv) != 3:
+        print("Usage: python bank_io.py <src> <dst>")
+        return
+
+    src, dst = Path(sys.argv[1]), Path(sys.argv[2])
+    if not src.exists():
+        print(f"Error: {src} not found!")
+        return
+
+    meta, questions = read_bank_meta(src)
+    with BankWriter(dst, meta=meta or None) as writer:
+        writer.write_all(questions)
+
+    print(f"✅ Wrote {writer.count} questions to {dst}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Extraction throughput and accuracy benchmark.
+
+Runs every extractor over either the real snowpro_raw.txt or a synthetic
+dump generated from a gold bank (scalable to many times the real size) and
+reports, per extractor:
+
+    MB/s, questions/s     wall-clock throughput of answer key + questions
+    peak memory           tracemalloc peak during a separate run
+    precision / recall    per field (question, A-F, correct) against gold
+
+Usage:
+    python benchmark.py                       # real dump vs ../snowpro_questions.json
+    python benchmark.py --scale 100           # synthetic dump, 100x the gold bank
+    python benchmark.py --scale 1000 --json bench.json
+"""
+
+import io
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import tracemalloc
+import contextlib
+from pathlib import Path
+
+import extract_all_questions
+import extract_flexible
+import extract_from_text
+from bank_io import read_bank
+
+
+GOLD_PATH = Path(__file__).parent.parent / "snowpro_questions.json"
+RAW_PATH = Path(__file__).parent / "snowpro_raw.txt"
+
+FIELDS = ["question", "A", "B", "C", "D", "E", "F", "correct"]
+
+# name -> (parse_answer_key, extract questions)
+EXTRACTORS = {
+    "extract_flexible": (extract_flexible.parse_answer_key,
+                         extract_flexible.extract_questions_flexible),
+    "extract_from_text": (extract_from_text.parse_answer_key,
+                          extract_from_text.extract_questions),
+    "extract_all_questions": (extract_all_questions.parse_answer_key,
+                              extract_all_questions.extract_all_questions),
+}
+
+# Whitespace-only filler lines like the ones PDF copy/paste leaves behind
+NOISE_LINES = [" ", "  ", "   ", "", "            ", "   "]
+
+
+def generate_raw_text(gold, scale=1, seed=0):
+    """Build a raw dump shaped like snowpro_raw.txt from gold questions.
+
+    The gold bank is repeated `scale` times with fresh question numbers.
+    Returns (text, expected) where expected is the gold list for the dump.
+    """
+    rng = random.Random(seed)
+    parts = ["SnowPro Core Test Prep Questions  \n"]
+    expected = []
+    key_lines = []
+
+    qnum = 0
+    for _ in range(scale):
+        for q in gold:
+            qnum += 1
+            record = {"qnum": qnum, "question": q.get("question", "")}
+            for lab in "ABCDEF":
+                record[lab] = q.get(lab, "") or ""
+            record["correct"] = q.get("correct")
+            expected.append(record)
+
+            parts.append("\n".join(rng.choice(NOISE_LINES) for _ in range(rng.randint(3, 40))))
+            parts.append(f"\n Question  #{qnum} Topic 1 \n \n \n")
+            parts.append(normalize_text(record["question"]) + "  \n \n")
+            for lab in "ABCDEF":
+                if record[lab]:
+                    parts.append(f"{lab}. {record[lab]}  \n")
+            parts.append(" \n \n")
+
+            letters = "".join(record["correct"] or []).lower()
+            key_lines.append(f"q{qnum} {letters or '?'} ")
+
+    parts.append("\n \nAnswers  \n \n")
+    parts.append("\n".join(key_lines))
+    parts.append("\n \n")
+    return "".join(parts), expected
+
+
+def normalize_text(value):
+    """Whitespace-normalize a field and drop the stray 'Topic N' prefix."""
+    if not value:
+        return ""
+    value = " ".join(str(value).split())
+    return re.sub(r'^Topic\s+\d+\s*', '', value)
+
+
+def normalize_field(field, value):
+    if field == "correct":
+        return tuple(sorted(value)) if value else ()
+    return normalize_text(value)
+
+
+def score_fields(extracted, expected):
+    """Field-level precision/recall of extracted questions against gold."""
+    gold = {q["qnum"]: q for q in expected}
+    stats = {f: {"tp": 0, "fp": 0, "fn": 0} for f in FIELDS}
+
+    seen = set()
+    for q in extracted:
+        qnum = q.get("qnum")
+        ref = gold.get(qnum)
+        if ref is not None:
+            seen.add(qnum)
+        for f in FIELDS:
+            got = normalize_field(f, q.get(f))
+            want = normalize_field(f, ref.get(f)) if ref else normalize_field(f, None)
+            if got and got == want:
+                stats[f]["tp"] += 1
+            else:
+                if got:
+                    stats[f]["fp"] += 1
+                if want:
+                    stats[f]["fn"] += 1
+
+    # Gold questions the extractor never produced
+    for qnum, ref in gold.items():
+        if qnum in seen:
+            continue
+        for f in FIELDS:
+            if normalize_field(f, ref.get(f)):
+                stats[f]["fn"] += 1
+
+    for s in stats.values():
+        tp, fp, fn = s["tp"], s["fp"], s["fn"]
+        s["precision"] = tp / (tp + fp) if tp + fp else 1.0
+        s["recall"] = tp / (tp + fn) if tp + fn else 1.0
+    return stats
+
+
+def run_extractor(name, text):
+    """Run one extractor end to end with its progress output silenced."""
+    parse_key, extract = EXTRACTORS[name]
+    with contextlib.redirect_stdout(io.StringIO()):
+        answers = parse_key(text)
+        return extract(text, answers)
+
+
+def bench_extractor(name, text, expected, repeat=1):
+    """Time, memory-profile and score a single extractor."""
+    size_mb = len(text.encode("utf-8")) / 1e6
+
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        questions = run_extractor(name, text)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+
+    # Separate run so tracemalloc overhead does not skew the timings
+    tracemalloc.start()
+    run_extractor(name, text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "extractor": name,
+        "seconds": best,
+        "mb_per_s": size_mb / best if best else float("inf"),
+        "questions": len(questions),
+        "questions_per_s": len(questions) / best if best else float("inf"),
+        "peak_mb": peak / 1e6,
+        "fields": score_fields(questions, expected),
+    }
+
+
+def print_report(results, size_mb, n_expected):
+    print(f"\nInput: {size_mb:.2f} MB, {n_expected} gold questions\n")
+    print(f"{'extractor':<24}{'sec':>8}{'MB/s':>9}{'q/s':>10}{'found':>8}{'peak MB':>9}")
+    for r in results:
+        print(f"{r['extractor']:<24}{r['seconds']:>8.3f}{r['mb_per_s']:>9.2f}"
+              f"{r['questions_per_s']:>10.0f}{r['questions']:>8}{r['peak_mb']:>9.1f}")
+
+    for r in results:
+        print(f"\n{r['extractor']} precision / recall:")
+        for f in FIELDS:
+            s = r["fields"][f]
+            print(f"  {f:<9} P={s['precision']:.3f}  R={s['recall']:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=0,
+                        help="synthetic dump of N x the gold bank (0 = real snowpro_raw.txt)")
+    parser.add_argument("--gold", type=Path, default=GOLD_PATH)
+    parser.add_argument("--raw", type=Path, default=RAW_PATH)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per extractor (best is kept)")
+    parser.add_argument("--only", choices=sorted(EXTRACTORS), action="append",
+                        help="limit to one or more extractors")
+    parser.add_argument("--json", type=Path, help="also write the report as JSON")
+    args = parser.parse_args()
+
+    gold = read_bank(args.gold)
+    if args.scale > 0:
+        print(f"Generating synthetic dump ({args.scale}x {len(gold)} questions)...")
+        text, expected = generate_raw_text(gold, args.scale, args.seed)
+    else:
+        if not args.raw.exists():
+            print(f"Error: {args.raw} not found!")
+            sys.exit(1)
+        with open(args.raw, 'r', encoding='utf-8', errors='ignore') as f:
+            text = f.read()
+        expected = gold
+
+    results = []
+    for name in args.only or EXTRACTORS:
+        print(f"Benchmarking {name}...")
+        results.append(bench_extractor(name, text, expected, args.repeat))
+
+    size_mb = len(text.encode("utf-8")) / 1e6
+    print_report(results, size_mb, len(expected))
+
+    if args.json:
+        report = {"scale": args.scale, "input_mb": size_mb,
+                  "gold_questions": len(expected), "results": results}
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Saved report to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Compile an extracted question bank into the pre-normalized artifact the
+app loads directly.
+
+Steps:
+    1. validate every record against the bank schema
+    2. repair PDF ligature breakage ("de ne" -> "define") and whitespace
+    3. drop the "Topic N" residue left in front of question text
+    4. canonicalize answers to sorted, de-duplicated letter lists
+    5. fill every option column A-F, recompute n_choices, add "multi"
+    6. stamp each record with its bank_diff content hash
+    7. sort by qnum and stamp schema version + source hash
+    8. re-export the Parquet copy (export_parquet.py) if one exists
+
+Usage:
+    python compile_bank.py [src] [dst]
+    (defaults: ../snowpro_questions.json -> ../snowpro_questions.compiled.json)
+"""
+
+import re
+import sys
+import json
+import hashlib
+from pathlib import Path
+from datetime import datetime, timezone
+
+from bank_io import BANK_SCHEMA_VERSION, read_bank, read_bank_header, write_bank
+from bank_diff import record_hash
+
+
+ROOT = Path(__file__).parent.parent
+DEFAULT_SRC = ROOT / "snowpro_questions.json"
+DEFAULT_DST = ROOT / "snowpro_questions.compiled.json"
+
+OPTION_LABELS = "ABCDEF"
+TEXT_FIELDS = ["question"] + list(OPTION_LABELS)
+
+# Words the PDF text layer split where an fi/fl/ff ligature used to be,
+# plus typography that renders inconsistently. Matched on word boundaries.
+LIGATURE_FIXES = {
+    "de ne": "define",
+    "de ned": "defined",
+    "de nes": "defines",
+    "de nition": "definition",
+    "work ow": "workflow",
+    "work ows": "workflows",
+    "over ow": "overflow",
+    "speci c": "specific",
+    "speci cally": "specifically",
+    "speci ed": "specified",
+    "con gure": "configure",
+    "con gured": "configured",
+    "con guration": "configuration",
+    "signi cant": "significant",
+    "signi cantly": "significantly",
+    "e cient": "efficient",
+    "e ciently": "efficiently",
+    "su cient": "sufficient",
+    "di erent": "different",
+    "di erence": "difference",
+    "e ect": "effect",
+    "a ect": "affect",
+    "o er": "offer",
+    "o ers": "offers",
+    "bene t": "benefit",
+    "bene ts": "benefits",
+    "pro le": "profile",
+    "identi er": "identifier",
+    "identi ers": "identifiers",
+    "modi ed": "modified",
+    "veri ed": "verified",
+    "classi cation": "classification",
+    "re ect": "reflect",
+    "in uence": "influence",
+    "ﬁ": "fi",
+    "ﬂ": "fl",
+    "ﬀ": "ff",
+    "’": "'",
+    "‘": "'",
+    "“": '"',
+    "”": '"',
+}
+
+_LIGATURE_RE = re.compile("|".join(
+    (r"\b" + re.escape(k) + r"\b") if k[0].isalnum() else re.escape(k)
+    for k in sorted(LIGATURE_FIXES, key=len, reverse=True)
+))
+_TOPIC_RE = re.compile(r'^\s*Topic\s+\d+\s*', re.IGNORECASE)
+_SPACES_RE = re.compile(r'[ \t\f\v]+')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+# "Snowflake 's" -> "Snowflake's"
+_APOSTROPHE_RE = re.compile(r"(\w) '(s|t|re|ll|ve|d)\b")
+
+
+def repair_text(value, multiline=False):
+    """Apply ligature fixes and normalize whitespace.
+
+    Question text keeps its line breaks (it is rendered as markdown);
+    option text is collapsed to a single line.
+    """
+    if not value:
+        return ""
+    value = _LIGATURE_RE.sub(lambda m: LIGATURE_FIXES[m.group(0)], str(value))
+    value = _APOSTROPHE_RE.sub(r"\1'\2", value)
+    if not multiline:
+        return " ".join(value.split())
+    lines = [_SPACES_RE.sub(" ", ln).strip() for ln in value.split("\n")]
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(lines)).strip()
+
+
+def canonical_answer(value):
+    """None / "abd" / ["b", "A"] -> sorted unique upper-case letter list."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        letters = value.upper()
+    elif isinstance(value, (list, tuple)):
+        letters = "".join(str(v).strip().upper() for v in value)
+    else:
+        return []
+    return sorted({c for c in letters if c in OPTION_LABELS})
+
+
+def validate_question(q):
+    """Return (errors, warnings) for a raw question record."""
+    errors, warnings = [], []
+    qnum = q.get("qnum")
+    if not isinstance(qnum, int) or isinstance(qnum, bool) or qnum <= 0:
+        errors.append(f"qnum must be a positive integer, got {qnum!r}")
+    if not isinstance(q.get("question"), str) or not q["question"].strip():
+        errors.append("question text is missing")
+    for lab in OPTION_LABELS:
+        if q.get(lab) is not None and not isinstance(q[lab], str):
+            errors.append(f"option {lab} must be a string")
+    correct = q.get("correct")
+    if correct is not None and not isinstance(correct, (list, str)):
+        errors.append(f"correct must be a list, string or null, got {type(correct).__name__}")
+
+    present = {lab for lab in OPTION_LABELS if isinstance(q.get(lab), str) and q[lab].strip()}
+    if len(present) < 2:
+        warnings.append("fewer than two options")
+    answer = canonical_answer(correct) if not errors else []
+    if not answer:
+        warnings.append("no answer")
+    elif not set(answer) <= present:
+        warnings.append(f"answer {''.join(answer)} references empty option(s)")
+    return errors, warnings
+
+
+def compile_question(q):
+    """Build the normalized record the app consumes."""
+    record = {
+        "qnum": int(q["qnum"]),
+        "question": repair_text(_TOPIC_RE.sub("", q.get("question") or ""), multiline=True),
+    }
+    for lab in OPTION_LABELS:
+        record[lab] = repair_text(q.get(lab))
+    record["correct"] = canonical_answer(q.get("correct"))
+    record["n_choices"] = sum(1 for lab in OPTION_LABELS if record[lab])
+    record["multi"] = len(record["correct"]) > 1
+    # Per-question content hash: lets consumers invalidate per question
+    record["hash"] = record_hash(record)
+    return record
+
+
+def compile_bank(questions):
+    """Validate and normalize a bank.
+
+    Returns (compiled, problems) where problems maps qnum (or record index
+    for unusable records) to a list of messages. Records with errors and
+    duplicate qnums (after the first) are dropped.
+    """
+    compiled = {}
+    problems = {}
+    for idx, q in enumerate(questions):
+        errors, warnings = validate_question(q)
+        key = q.get("qnum") if not errors else f"#{idx}"
+        if errors:
+            problems[key] = errors
+            continue
+        if warnings:
+            problems.setdefault(key, []).extend(warnings)
+        if q["qnum"] in compiled:
+            problems.setdefault(key, []).append("duplicate qnum (dropped)")
+            continue
+        compiled[q["qnum"]] = compile_question(q)
+    return [compiled[k] for k in sorted(compiled)], problems
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def content_sha256(compiled):
+    """Hash of the compiled records themselves (independent of build time)."""
+    h = hashlib.sha256()
+    for q in compiled:
+        h.update(json.dumps(q, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+        h.update(b'\n')
+    return h.hexdigest()
+
+
+def write_compiled(compiled, dst, source, source_sha256, skip_unchanged=False):
+    """Write a compiled bank with its metadata header.
+
+    With skip_unchanged, an existing artifact with the same schema version,
+    source hash and content hash is left alone so its mtime (and any cache
+    keyed on it) is untouched. A source that was only re-saved still gets
+    a new header, since readers check the artifact against it. Returns
+    True if dst was written.
+    """
+    dst = Path(dst)
+    digest = content_sha256(compiled)
+    if skip_unchanged and dst.exists():
+        old_meta = read_bank_header(dst)
+        if (old_meta.get("schema_version") == BANK_SCHEMA_VERSION
+                and old_meta.get("source_sha256") == source_sha256
+                and old_meta.get("content_sha256") == digest):
+            return False
+    meta = {
+        "schema_version": BANK_SCHEMA_VERSION,
+        "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "source": source,
+        "source_sha256": source_sha256,
+        "content_sha256": digest,
+        "count": len(compiled),
+    }
+    write_bank(dst, compiled, indent=None, meta=meta)
+    return True
+
+
+def parquet_sibling(dst):
+    """Columnar copy of a compiled bank, e.g. x.compiled.json -> x.parquet."""
+    dst = Path(dst)
+    return dst.with_name(dst.name.split(".")[0] + ".parquet")
+
+
+def build(src=DEFAULT_SRC, dst=DEFAULT_DST):
+    """Compile src into dst and re-export its Parquet copy if there is one.
+
+    Returns (count, problems, parquet); parquet is the refreshed file, or
+    None when there is none or pyarrow is missing to refresh it.
+    """
+    src, dst = Path(src), Path(dst)
+    compiled, problems = compile_bank(read_bank(src))
+    write_compiled(compiled, dst, src.name, file_sha256(src))
+    parquet = parquet_sibling(dst)
+    if not parquet.exists():
+        return len(compiled), problems, None
+    import export_parquet  # imports this module
+    if not export_parquet.PYARROW_AVAILABLE:
+        return len(compiled), problems, None
+    export_parquet.export(dst, parquet)
+    return len(compiled), problems, parquet
+
+
+def main():
+    """Compile the bank and print any schema problems."""
+    src = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SRC
+    dst = Path(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_DST
+
+    if not src.exists():
+        print(f"Error: {src} not found!")
+        return
+
+    print(f"Compiling {src}...")
+    count, problems, parquet = build(src, dst)
+
+    for key, msgs in problems.items():
+        label = f"Q{key}" if isinstance(key, int) else f"Record {key}"
+        print(f"  {label}: {'; '.join(msgs)}")
+
+    print(f"\n✅ Compiled {count} questions to {dst} (schema v{BANK_SCHEMA_VERSION})")
+    if parquet:
+        print(f"✅ Re-exported {parquet}")
+    elif parquet_sibling(dst).exists():
+        print(f"⚠️  {parquet_sibling(dst).name} is now stale (pyarrow not installed); the app will skip it")
+
+
+if __name__ == "__main__":
+    main()
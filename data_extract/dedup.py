@@ -0,0 +1,207 @@
+"""
+Near-duplicate question detection with shingling + MinHash LSH.
+
+Each question (stem plus option text) is turned into a set of word
+shingles, summarized by a MinHash signature, and split into LSH bands.
+Only questions that share a band bucket are compared, so merged banks of
+tens of thousands of questions are checked without pairwise comparison.
+Candidates are confirmed with the exact Jaccard similarity of their
+shingle sets and grouped into clusters.
+
+Usage:
+    python dedup.py                                  # the three repo banks
+    python dedup.py a.json b.ndjson --threshold 0.7
+    python dedup.py a.json b.json --write merged.json  # keep first of each cluster
+"""
+
+import re
+import sys
+import json
+import random
+import hashlib
+import argparse
+from pathlib import Path
+from collections import defaultdict
+
+from bank_io import read_bank, write_bank
+
+
+ROOT = Path(__file__).parent.parent
+DEFAULT_BANKS = [
+    ROOT / "snowpro_questions.json",
+    Path(__file__).parent / "snowpro_questions_backup.json",
+    Path(__file__).parent / "snowpro_questions.csv",
+]
+
+OPTION_LABELS = "ABCDEF"
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def question_text(q):
+    """Stem and options as one string (option order is kept)."""
+    parts = [str(q.get("question") or "")]
+    parts.extend(str(q.get(lab) or "") for lab in OPTION_LABELS)
+    return " ".join(parts)
+
+
+def shingles(text, k=3):
+    """Set of k-word shingles, hashed to 32-bit ints."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) < k:
+        tokens = tokens + [""] * (k - len(tokens))
+    result = set()
+    for i in range(len(tokens) - k + 1):
+        digest = hashlib.blake2b(" ".join(tokens[i:i + k]).encode(), digest_size=4).digest()
+        result.add(int.from_bytes(digest, "little"))
+    return result
+
+
+def choose_bands(num_perm, threshold):
+    """Pick (bands, rows) with bands*rows == num_perm whose LSH S-curve
+    threshold (1/bands)**(1/rows) is closest to the requested one."""
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        err = abs((1 / bands) ** (1 / rows) - threshold)
+        if best is None or err < best[0]:
+            best = (err, bands, rows)
+    return best[1], best[2]
+
+
+class MinHasher:
+    """Universal hash family h(x) = (a*x + b) mod p, truncated to 32 bits."""
+
+    def __init__(self, num_perm=128, seed=1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.params = [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+                       for _ in range(num_perm)]
+
+    def signature(self, shingle_set):
+        if not shingle_set:
+            return (MAX_HASH,) * self.num_perm
+        xs = list(shingle_set)
+        p = MERSENNE_PRIME
+        # min of the full 61-bit values, truncated afterwards: still a valid
+        # MinHash and keeps the masking out of the inner loop
+        return tuple(min([(a * x + b) % p for x in xs]) & MAX_HASH for a, b in self.params)
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def find_near_duplicates(questions, threshold=0.8, num_perm=128, k=3, seed=1):
+    """Cluster near-duplicate questions.
+
+    Returns a list of clusters, each a list of (index, similarity to the
+    cluster's first member) sorted by index. Singletons are omitted.
+    """
+    hasher = MinHasher(num_perm, seed)
+    bands, rows = choose_bands(num_perm, threshold)
+
+    sets = [shingles(question_text(q), k) for q in questions]
+    buckets = defaultdict(list)
+    for idx, s in enumerate(sets):
+        sig = hasher.signature(s)
+        for band in range(bands):
+            buckets[(band, sig[band * rows:(band + 1) * rows])].append(idx)
+
+    # Union-find over confirmed candidate pairs
+    parent = list(range(len(questions)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    checked = set()
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        for i in range(len(members)):
+            for j in range(i + 1, len(members)):
+                pair = (members[i], members[j])
+                if pair in checked:
+                    continue
+                checked.add(pair)
+                if jaccard(sets[pair[0]], sets[pair[1]]) >= threshold:
+                    ri, rj = find(pair[0]), find(pair[1])
+                    if ri != rj:
+                        parent[max(ri, rj)] = min(ri, rj)
+
+    groups = defaultdict(list)
+    for idx in range(len(questions)):
+        groups[find(idx)].append(idx)
+
+    clusters = []
+    for root, members in sorted(groups.items()):
+        if len(members) < 2:
+            continue
+        clusters.append([(m, jaccard(sets[root], sets[m])) for m in sorted(members)])
+    return clusters
+
+
+def dedup_questions(questions, threshold=0.8, **kwargs):
+    """Drop all but the first member of each near-duplicate cluster.
+
+    Returns (kept, clusters).
+    """
+    clusters = find_near_duplicates(questions, threshold, **kwargs)
+    dropped = {idx for cluster in clusters for idx, _ in cluster[1:]}
+    kept = [q for idx, q in enumerate(questions) if idx not in dropped]
+    return kept, clusters
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find near-duplicate questions across banks.")
+    parser.add_argument("banks", nargs="*", type=Path, default=DEFAULT_BANKS)
+    parser.add_argument("--threshold", type=float, default=0.8, help="Jaccard similarity cut-off")
+    parser.add_argument("--num-perm", type=int, default=128)
+    parser.add_argument("--shingle", type=int, default=3, help="words per shingle")
+    parser.add_argument("--write", type=Path, help="write the merged, de-duplicated bank here")
+    parser.add_argument("--json", type=Path, help="write the clusters as JSON")
+    args = parser.parse_args()
+
+    questions, origin = [], []
+    for bank in args.banks:
+        if not bank.exists():
+            print(f"Error: {bank} not found!")
+            sys.exit(1)
+        loaded = read_bank(bank)
+        print(f"Loaded {len(loaded)} questions from {bank.name}")
+        questions.extend(loaded)
+        origin.extend((bank.name, q.get("qnum")) for q in loaded)
+
+    kept, clusters = dedup_questions(questions, args.threshold,
+                                     num_perm=args.num_perm, k=args.shingle)
+
+    # Clusters where every member has the same qnum are the expected copies
+    # across banks; the rest are worth a look
+    cross = [c for c in clusters if len({origin[i][1] for i, _ in c}) > 1]
+    print(f"\n{len(clusters)} near-duplicate clusters, {len(cross)} spanning different qnums")
+    for cluster in cross:
+        print("  " + ", ".join(f"{origin[i][0]}:Q{origin[i][1]} ({sim:.2f})" for i, sim in cluster))
+
+    if args.json:
+        report = [[{"bank": origin[i][0], "qnum": origin[i][1], "similarity": round(sim, 4)}
+                   for i, sim in cluster] for cluster in clusters]
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved clusters to {args.json}")
+
+    if args.write:
+        write_bank(args.write, kept)
+        print(f"\n✅ Wrote {len(kept)} of {len(questions)} questions to {args.write}")
+
+
+if __name__ == "__main__":
+    main()
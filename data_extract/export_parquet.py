@@ -0,0 +1,129 @@
+"""
+Export the compiled question bank to a typed columnar file.
+
+Columns:
+    qnum         int32
+    question     string
+    A .. F       string ("" when the option is absent)
+    correct      list<string>   e.g. ["B", "D"]
+    answer_mask  uint8          bit 0 = A ... bit 5 = F
+    n_choices    int8
+    multi        bool
+    hash         string         per-question content hash (bank_diff)
+
+Bank metadata (schema version, source and content hashes, ...) is stored
+in the file's schema metadata; the app only serves the file while those
+hashes match the compiled and raw banks next to it. Readers can project columns, e.g.
+
+    pd.read_parquet("snowpro_questions.parquet", columns=["qnum", "answer_mask"])
+
+Writes .parquet (zstd) or Arrow IPC (.arrow / .feather), atomically.
+Requires pyarrow: pip install pyarrow
+
+Usage:
+    python export_parquet.py [src] [dst]
+    (defaults: ../snowpro_questions.compiled.json -> ../snowpro_questions.parquet)
+"""
+
+import os
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+from bank_io import BANK_SCHEMA_VERSION, read_bank_meta
+from compile_bank import DEFAULT_DST as DEFAULT_SRC, ROOT, compile_bank, content_sha256, file_sha256
+
+# answer_mask uses the app's bit layout, so share its encoder
+sys.path.append(str(ROOT))
+from learner_history import OPTION_LABELS, letters_mask  # noqa: E402
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import pyarrow.feather as feather
+    PYARROW_AVAILABLE = True
+except Exception:
+    PYARROW_AVAILABLE = False
+
+
+DEFAULT_PARQUET = ROOT / "snowpro_questions.parquet"
+
+
+def bank_schema(meta=None):
+    fields = [pa.field("qnum", pa.int32()), pa.field("question", pa.string())]
+    fields += [pa.field(lab, pa.string()) for lab in OPTION_LABELS]
+    fields += [
+        pa.field("correct", pa.list_(pa.string())),
+        pa.field("answer_mask", pa.uint8()),
+        pa.field("n_choices", pa.int8()),
+        pa.field("multi", pa.bool_()),
+        pa.field("hash", pa.string()),
+    ]
+    metadata = {k: json.dumps(v) for k, v in (meta or {}).items()}
+    return pa.schema(fields, metadata=metadata)
+
+
+def to_table(compiled, meta=None):
+    """Build an Arrow table from compiled question records."""
+    columns = {
+        "qnum": [q["qnum"] for q in compiled],
+        "question": [q["question"] for q in compiled],
+    }
+    for lab in OPTION_LABELS:
+        columns[lab] = [q.get(lab, "") for q in compiled]
+    columns["correct"] = [q["correct"] for q in compiled]
+    columns["answer_mask"] = [letters_mask(q["correct"]) for q in compiled]
+    columns["n_choices"] = [q["n_choices"] for q in compiled]
+    columns["multi"] = [q["multi"] for q in compiled]
+    columns["hash"] = [q["hash"] for q in compiled]
+    return pa.Table.from_pydict(columns, schema=bank_schema(meta))
+
+
+def write_table(table, dst):
+    """Write a table to .parquet or Arrow IPC via a temp file + os.replace()."""
+    dst = Path(dst)
+    fd, tmp = tempfile.mkstemp(prefix=f".{dst.name}.", suffix=".tmp", dir=dst.parent)
+    os.close(fd)
+    try:
+        if dst.suffix.lower() in (".arrow", ".feather"):
+            feather.write_feather(table, tmp, compression="zstd")
+        else:
+            pq.write_table(table, tmp, compression="zstd")
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, dst)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+def export(src=DEFAULT_SRC, dst=DEFAULT_PARQUET):
+    """Export a bank to dst; raw banks are compiled on the way. Returns row count."""
+    meta, questions = read_bank_meta(src)
+    if meta.get("schema_version") != BANK_SCHEMA_VERSION:
+        questions, _ = compile_bank(questions)
+        meta = {"schema_version": BANK_SCHEMA_VERSION, "source": Path(src).name,
+                "source_sha256": file_sha256(src), "content_sha256": content_sha256(questions)}
+    write_table(to_table(questions, meta), dst)
+    return len(questions)
+
+
+def main():
+    """Export the compiled bank to Parquet / Arrow."""
+    if not PYARROW_AVAILABLE:
+        print("Error: pyarrow is required: pip install pyarrow")
+        sys.exit(1)
+
+    src = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SRC
+    dst = Path(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_PARQUET
+
+    if not src.exists():
+        print(f"Error: {src} not found!")
+        return
+
+    count = export(src, dst)
+    print(f"✅ Exported {count} questions to {dst}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,9 +7,11 @@ Usage:
 """
 
 import re
-import json
 from pathlib import Path
 
+from bank_io import write_bank
+from run_report import RunReport
+
 
 def parse_answer_key(text):
     """Parse the answer key section into a dictionary."""
@@ -39,34 +41,45 @@ def parse_answer_key(text):
     return answers
 
 
-def extract_all_questions(text, answers_dict):
+def extract_all_questions(text, answers_dict, report=None):
     """Extract all questions from the PDF text."""
+    report = report or RunReport("extract_all_questions")
     questions = []
     
     # Pattern to match "Question #<number> Topic"
     question_pattern = r'Question #(\d+)'
     
     # Split by question markers
-    parts = re.split(question_pattern, text)
+    with report.stage("split"):
+        parts = re.split(question_pattern, text)
+    report.set("markers_found", len(parts) // 2)
     
     # Process pairs (qnum, content)
-    for i in range(1, len(parts), 2):
-        if i + 1 >= len(parts):
-            break
-        
-        qnum = int(parts[i])
-        content = parts[i + 1]
-        
-        # Stop if we hit the answers section
-        if 'Answers' in content and content.index('Answers') < 100:
-            break
-        
-        try:
-            q_obj = parse_single_question(qnum, content, answers_dict)
+    with report.stage("parse"):
+        for i in range(1, len(parts), 2):
+            if i + 1 >= len(parts):
+                break
+            
+            qnum = int(parts[i])
+            content = parts[i + 1]
+            
+            # Stop if we hit the answers section
+            if 'Answers' in content and content.index('Answers') < 100:
+                break
+            
+            try:
+                q_obj = parse_single_question(qnum, content, answers_dict)
+            except Exception as e:
+                print(f"Warning: Error parsing Q{qnum}: {e}")
+                report.count("parse_errors")
+                report.warn("parse_error", qnum=qnum, error=str(e))
+                continue
             if q_obj:
                 questions.append(q_obj)
-        except Exception as e:
-            print(f"Warning: Error parsing Q{qnum}: {e}")
+                report.record_question(q_obj)
+            else:
+                report.count("questions_without_options")
+                report.warn("no_options", qnum=qnum)
     
     return sorted(questions, key=lambda x: x['qnum'])
 
@@ -153,25 +166,30 @@ def main():
         return
     
     print(f"Reading {pdf_path}...")
+    report = RunReport("extract_all_questions", source=str(pdf_path))
     
     # Read the content
     # Note: For actual PDF reading, you'd use PyPDF2 or similar
     # Since you provided the text, we'll work with that
-    with open(pdf_path, 'r', encoding='utf-8', errors='ignore') as f:
-        pdf_text = f.read()
+    with report.stage("read"):
+        with open(pdf_path, 'r', encoding='utf-8', errors='ignore') as f:
+            pdf_text = f.read()
+    report.set("input_chars", len(pdf_text))
     
     print("Parsing answer key...")
-    answers_dict = parse_answer_key(pdf_text)
+    with report.stage("answer_key"):
+        answers_dict = parse_answer_key(pdf_text)
+    report.set("answers_found", len(answers_dict))
     print(f"  Found {len(answers_dict)} answers")
     
     print("Extracting questions...")
-    questions = extract_all_questions(pdf_text, answers_dict)
+    questions = extract_all_questions(pdf_text, answers_dict, report)
     print(f"  Extracted {len(questions)} questions")
     
     # Save to JSON
     output_path = Path("snowpro_questions.json")
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(questions, f, indent=2, ensure_ascii=False)
+    with report.stage("write"):
+        write_bank(output_path, questions)
     
     print(f"\n✓ Saved to {output_path}")
     
@@ -194,6 +212,9 @@ def main():
         print(f"\nLast question:")
         print(f"  Q{questions[-1]['qnum']}: {questions[-1]['question'][:80]}...")
         print(f"  Answer: {questions[-1]['correct']}")
+    
+    report.print_summary()
+    report.save("extract_report.json")
 
 
 if __name__ == "__main__":
@@ -3,27 +3,20 @@ Flexible extractor that handles different PDF text formats
 """
 
 import re
-import json
 from pathlib import Path
 
+from answer_key import index_answer_key, print_diagnostics
+from bank_io import BankWriter, write_bank
+from run_report import RunReport
 
-def parse_answer_key(text):
-    """Extract answer key - try multiple patterns."""
-    answers = {}
-    
-    # Look for answer patterns
-    patterns = [
-        r'q(\d+)\s+([a-f]+)',  # q1 b
-        r'Question\s+(\d+).*?answer[:\s]+([a-f]+)',  # Question 1 answer: b
-    ]
-    
-    for pattern in patterns:
-        matches = re.finditer(pattern, text, re.IGNORECASE)
-        for match in matches:
-            qnum = int(match.group(1))
-            letters = [c.upper() for c in match.group(2)]
-            answers[qnum] = letters
-    
+
+def parse_answer_key(text, report=None):
+    """Extract answer key from the Answers section in a single pass."""
+    answers, diagnostics = index_answer_key(text)
+    print_diagnostics(diagnostics)
+    if report:
+        report.set("answers_found", len(answers))
+        report.attach("answer_key", diagnostics)
     return answers
 
 
@@ -53,11 +46,19 @@ def find_question_markers(text):
     return all_matches
 
 
-def extract_questions_flexible(text, answers_dict):
-    """Extract questions using flexible matching."""
+def extract_questions_flexible(text, answers_dict, on_question=None, report=None):
+    """Extract questions using flexible matching.
+
+    If on_question is given it is called with each question as soon as it
+    is parsed (e.g. BankWriter.write to stream an NDJSON bank). Timings for
+    the split and parse stages and per-question counters go to report.
+    """
+    report = report or RunReport("extract_flexible")
     
     print("Searching for question markers...")
-    markers = find_question_markers(text)
+    with report.stage("split"):
+        markers = find_question_markers(text)
+    report.set("markers_found", len(markers))
     
     if not markers:
         print("No question markers found!")
@@ -68,22 +69,30 @@ def extract_questions_flexible(text, answers_dict):
     questions = []
     
     # Process each marker
-    for i, (qnum_str, start, end) in enumerate(markers):
-        qnum = int(qnum_str)
-        
-        # Get content between this marker and the next one
-        if i + 1 < len(markers):
-            content = text[end:markers[i+1][1]]
-        else:
-            content = text[end:]
-        
-        # Stop at answers section
-        if 'Answers' in content[:100]:
-            break
-        
-        q_obj = parse_question_flexible(qnum, content, answers_dict)
-        if q_obj:
+    with report.stage("parse"):
+        for i, (qnum_str, start, end) in enumerate(markers):
+            qnum = int(qnum_str)
+            
+            # Get content between this marker and the next one
+            if i + 1 < len(markers):
+                content = text[end:markers[i+1][1]]
+            else:
+                content = text[end:]
+            
+            # Stop at answers section
+            if 'Answers' in content[:100]:
+                break
+            
+            q_obj = parse_question_flexible(qnum, content, answers_dict)
+            if not q_obj:
+                report.count("questions_without_options")
+                report.warn("no_options", qnum=qnum, offset=start)
+                continue
+            
             questions.append(q_obj)
+            report.record_question(q_obj)
+            if on_question:
+                on_question(q_obj)
             
             if len(questions) % 50 == 0:
                 print(f"  Extracted {len(questions)} questions...")
@@ -160,9 +169,13 @@ def main():
         print("Error: snowpro_raw.txt not found!")
         return
     
+    report = RunReport("extract_flexible", source=str(text_file))
+    
     print("Reading snowpro_raw.txt...")
-    with open(text_file, 'r', encoding='utf-8', errors='ignore') as f:
-        text = f.read()
+    with report.stage("read"):
+        with open(text_file, 'r', encoding='utf-8', errors='ignore') as f:
+            text = f.read()
+    report.set("input_chars", len(text))
     
     print(f"Read {len(text):,} characters\n")
     
@@ -174,14 +187,20 @@ def main():
     print()
     
     print("Parsing answer key...")
-    answers_dict = parse_answer_key(text)
+    with report.stage("answer_key"):
+        answers_dict = parse_answer_key(text, report)
     print(f"Found {len(answers_dict)} answers\n")
     
     print("Extracting questions...")
-    questions = extract_questions_flexible(text, answers_dict)
+    # Stream to NDJSON while parsing; only lands once extraction completes
+    stream_file = Path("snowpro_questions.ndjson")
+    with BankWriter(stream_file) as stream:
+        questions = extract_questions_flexible(text, answers_dict, stream.write, report)
     print(f"\nExtracted {len(questions)} questions")
     
+    report_file = Path("extract_report.json")
     if len(questions) == 0:
+        report.save(report_file)
         print("\n⚠️  Still no questions found!")
         print("\nLet's try manual text extraction:")
         print("1. Open 'SnowPro Core Test Prep.pdf' in Preview")
@@ -206,10 +225,10 @@ def main():
     
     # Save
     output_file = Path("snowpro_questions.json")
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(questions, f, indent=2, ensure_ascii=False)
+    with report.stage("write"):
+        write_bank(output_file, questions)
     
-    print(f"\n✅ Saved {len(questions)} questions to {output_file}")
+    print(f"\n✅ Saved {len(questions)} questions to {output_file} (stream: {stream_file})")
     
     # Stats
     with_answers = sum(1 for q in questions if q.get('correct'))
@@ -218,6 +237,10 @@ def main():
     print(f"  Total: {len(questions)}")
     print(f"  With answers: {with_answers}")
     print(f"  Question range: Q{questions[0]['qnum']} to Q{questions[-1]['qnum']}")
+    
+    report.print_summary()
+    report.save(report_file)
+    print(f"\nRun report saved to {report_file}")
 
 
 if __name__ == "__main__":
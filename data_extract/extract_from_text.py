@@ -4,9 +4,11 @@ Works with snowpro_raw.txt
 """
 
 import re
-import json
 from pathlib import Path
 
+from bank_io import write_bank
+from run_report import RunReport
+
 
 def parse_answer_key(text):
     """Extract answer key from the text."""
@@ -36,30 +38,39 @@ def parse_answer_key(text):
     return answers
 
 
-def extract_questions(text, answers_dict):
+def extract_questions(text, answers_dict, report=None):
     """Extract all questions from the text."""
+    report = report or RunReport("extract_from_text")
     questions = []
     
     # Split by "Question #<number>"
-    parts = re.split(r'Question #(\d+)', text)
+    with report.stage("split"):
+        parts = re.split(r'Question #(\d+)', text)
+    report.set("markers_found", len(parts) // 2)
     
     print(f"Found {len(parts)//2} potential question blocks")
     
     # Process each question
-    for i in range(1, len(parts), 2):
-        if i + 1 >= len(parts):
-            break
-        
-        qnum = int(parts[i])
-        content = parts[i + 1]
-        
-        # Stop if we hit the Answers section
-        if content.strip().startswith('Answers'):
-            break
-        
-        q_obj = parse_question(qnum, content, answers_dict)
-        if q_obj:
+    with report.stage("parse"):
+        for i in range(1, len(parts), 2):
+            if i + 1 >= len(parts):
+                break
+            
+            qnum = int(parts[i])
+            content = parts[i + 1]
+            
+            # Stop if we hit the Answers section
+            if content.strip().startswith('Answers'):
+                break
+            
+            q_obj = parse_question(qnum, content, answers_dict)
+            if not q_obj:
+                report.count("questions_without_options")
+                report.warn("no_options", qnum=qnum)
+                continue
+            
             questions.append(q_obj)
+            report.record_question(q_obj)
             if len(questions) % 50 == 0:
                 print(f"  Extracted {len(questions)} questions...")
     
@@ -145,21 +156,29 @@ def main():
         print("5. Run this script again")
         return
     
+    report = RunReport("extract_from_text", source=str(text_file))
+    report_file = Path("extract_report.json")
+    
     print("Reading snowpro_raw.txt...")
-    with open(text_file, 'r', encoding='utf-8', errors='ignore') as f:
-        text = f.read()
+    with report.stage("read"):
+        with open(text_file, 'r', encoding='utf-8', errors='ignore') as f:
+            text = f.read()
+    report.set("input_chars", len(text))
     
     print(f"Read {len(text):,} characters")
     
     print("\nParsing answer key...")
-    answers_dict = parse_answer_key(text)
+    with report.stage("answer_key"):
+        answers_dict = parse_answer_key(text)
+    report.set("answers_found", len(answers_dict))
     print(f"Found {len(answers_dict)} answers")
     
     print("\nExtracting questions...")
-    questions = extract_questions(text, answers_dict)
+    questions = extract_questions(text, answers_dict, report)
     print(f"Extracted {len(questions)} questions")
     
     if len(questions) == 0:
+        report.save(report_file)
         print("\n⚠️  No questions found!")
         print("The text file might not be formatted correctly.")
         print("Make sure it contains the full PDF text including 'Question #' markers")
@@ -178,8 +197,8 @@ def main():
     
     # Save new file
     output_file = Path("snowpro_questions.json")
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(questions, f, indent=2, ensure_ascii=False)
+    with report.stage("write"):
+        write_bank(output_file, questions)
     
     print(f"\n✅ Saved {len(questions)} questions to {output_file}")
     
@@ -196,6 +215,9 @@ def main():
     # Show range
     if questions:
         print(f"\nQuestion range: Q{questions[0]['qnum']} to Q{questions[-1]['qnum']}")
+    
+    report.print_summary()
+    report.save(report_file)
 
 
 if __name__ == "__main__":
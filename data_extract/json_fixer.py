@@ -2,9 +2,10 @@
 Quick fixer to add missing answers to existing snowpro_questions.json
 """
 
-import json
 from pathlib import Path
 
+from bank_io import read_bank, write_bank
+
 # Missing answers from the PDF answer key
 MISSING_ANSWERS = {
     278: ["D", "E", "F"],
@@ -24,8 +25,7 @@ def fix_json():
         return
     
     # Load existing data
-    with open(json_path, 'r', encoding='utf-8') as f:
-        questions = json.load(f)
+    questions = read_bank(json_path)
     
     print(f"Loaded {len(questions)} questions")
     
@@ -39,8 +39,7 @@ def fix_json():
             print(f"  Fixed Q{qnum}: {MISSING_ANSWERS[qnum]}")
     
     # Save back
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(questions, f, indent=2, ensure_ascii=False)
+    write_bank(json_path, questions)
     
     print(f"\n✓ Fixed {fixed_count} questions")
     print(f"✓ Saved to {json_path}")
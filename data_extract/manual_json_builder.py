@@ -3,9 +3,10 @@ Build complete snowpro_questions.json with all 401 questions
 Based on the PDF content provided
 """
 
-import json
 from pathlib import Path
 
+from bank_io import read_bank, write_bank
+
 # This will merge your existing 240 questions with the missing ones
 # The missing question numbers from your current JSON
 
@@ -108,8 +109,7 @@ def main():
         return
     
     # Load existing questions
-    with open(json_path, 'r') as f:
-        questions = json.load(f)
+    questions = read_bank(json_path)
     
     print(f"Current JSON has {len(questions)} questions")
     
@@ -146,8 +146,7 @@ def main():
     shutil.copy(json_path, backup_path)
     print(f"\nBacked up to {backup_path}")
     
-    with open(json_path, 'w') as f:
-        json.dump(questions, f, indent=2, ensure_ascii=False)
+    write_bank(json_path, questions)
     
     print(f"✅ Updated {json_path}")
     print(f"\nCurrent status:")
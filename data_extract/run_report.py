@@ -0,0 +1,90 @@
+"""
+Per-run instrumentation for the extraction scripts.
+
+A RunReport collects stage timings, counters and structured warnings while
+an extractor runs, and can be saved as a machine-readable JSON report so
+runs over new dumps can be compared for regressions and slow stages.
+
+    report = RunReport("extract_flexible", source="snowpro_raw.txt")
+    with report.stage("read"):
+        text = ...
+    report.count("markers_found", len(markers))
+    report.warn("parse_error", qnum=12, error="...")
+    report.save("extract_report.json")
+"""
+
+import time
+import json
+import contextlib
+from datetime import datetime, timezone
+
+
+class RunReport:
+    """Stage timings, counters and warnings for one extraction run."""
+
+    def __init__(self, extractor, **meta):
+        self.extractor = extractor
+        self.meta = meta
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.stages = {}
+        self.counters = {}
+        self.warnings = []
+        self.sections = {}
+        self._t0 = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time a pipeline stage; repeated stages accumulate."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - t0
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def set(self, name, value):
+        self.counters[name] = value
+
+    def warn(self, kind, **fields):
+        self.warnings.append({"kind": kind, **fields})
+
+    def record_question(self, q):
+        """Update the standard per-question counters for a parsed question."""
+        self.count("questions_parsed")
+        if not q.get("correct"):
+            self.count("questions_no_answer")
+        elif len(q["correct"]) > 1:
+            self.count("questions_multi_answer")
+        if q.get("F"):
+            self.count("questions_with_f")
+
+    def attach(self, name, data):
+        """Attach a nested diagnostics block (e.g. the answer-key report)."""
+        self.sections[name] = data
+
+    def to_dict(self):
+        return {
+            "extractor": self.extractor,
+            "started_at": self.started_at,
+            "total_seconds": round(time.perf_counter() - self._t0, 6),
+            **self.meta,
+            "stages": {k: round(v, 6) for k, v in self.stages.items()},
+            "counters": dict(self.counters),
+            "warnings": list(self.warnings),
+            **self.sections,
+        }
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+
+    def print_summary(self):
+        print("\nRun report:")
+        for name, secs in self.stages.items():
+            print(f"  {name:<12} {secs * 1000:9.1f} ms")
+        for name, value in self.counters.items():
+            print(f"  {name}: {value}")
+        if self.warnings:
+            print(f"  warnings: {len(self.warnings)}")
@@ -0,0 +1,217 @@
+"""
+Watch the curated bank and answer overlays and keep the compiled bank fresh.
+
+Polls ../snowpro_questions.json (the same source compile_bank.py reads,
+including the json_fixer / manual_json_builder fixes) and overlays/*.json.
+When something changes (and has stopped changing for one interval) it
+rebuilds only what is stale:
+
+    bank changed       -> re-read it, re-apply overlays, compile
+    overlay changed    -> reuse the last read, re-apply overlays, compile
+
+The compiled artifact is only rewritten when its content hash changes, so
+the app (which keys its cache on the artifact's mtime/size) picks up new
+data on the next rerun and keeps serving its cache otherwise. A rebuild
+that would drop questions from the current artifact is refused (with a
+warning listing them) unless --allow-removals is given.
+
+Overlay files patch extracted questions by qnum, e.g. overlays/answers.json:
+
+    {"92": {"correct": ["A"]}, "278": {"F": "Option text", "correct": "def"}}
+
+Usage:
+    python watch_bank.py            # watch until Ctrl+C
+    python watch_bank.py --once     # rebuild if stale and exit
+    python watch_bank.py --parquet  # also keep ../snowpro_questions.parquet fresh
+                                    # (automatic once that file exists)
+"""
+
+import sys
+import json
+import time
+import argparse
+import hashlib
+from pathlib import Path
+
+import export_parquet
+from bank_diff import diff_banks
+from bank_io import read_bank
+from compile_bank import DEFAULT_DST, DEFAULT_SRC, compile_bank, parquet_sibling, write_compiled
+from run_report import RunReport
+
+
+HERE = Path(__file__).parent
+DEFAULT_OVERLAYS = HERE / "overlays"
+
+
+def snapshot(src_path, overlay_dir):
+    """Map each watched file to (mtime_ns, size)."""
+    paths = [src_path]
+    if overlay_dir.is_dir():
+        paths.extend(sorted(overlay_dir.glob("*.json")))
+    state = {}
+    for p in paths:
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            continue
+        state[p] = (st.st_mtime_ns, st.st_size)
+    return state
+
+
+def load_overlays(overlay_dir):
+    """Merge every overlay file (in name order) into {qnum: patch}."""
+    merged = {}
+    if not overlay_dir.is_dir():
+        return merged
+    for path in sorted(overlay_dir.glob("*.json")):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for qnum, patch in data.items():
+            merged.setdefault(int(qnum), {}).update(patch)
+    return merged
+
+
+def apply_overlays(questions, overlays):
+    """Return questions with overlay patches applied (new qnums are added)."""
+    patched = []
+    seen = set()
+    for q in questions:
+        patch = overlays.get(q["qnum"])
+        patched.append({**q, **patch} if patch else q)
+        seen.add(q["qnum"])
+    for qnum, patch in overlays.items():
+        if qnum not in seen:
+            patched.append({"qnum": qnum, **patch})
+    return patched
+
+
+class BankBuilder:
+    """Holds the last read of the bank so overlay-only edits skip re-parsing."""
+
+    def __init__(self, src, overlay_dir, dst, parquet=None, allow_removals=False):
+        self.src = Path(src)
+        self.overlay_dir = Path(overlay_dir)
+        self.dst = Path(dst)
+        self.parquet = Path(parquet) if parquet else None
+        self.allow_removals = allow_removals
+        self._src_sha = None
+        self._questions = []
+
+    def read(self, report):
+        with report.stage("read"):
+            data = self.src.read_bytes()
+        src_sha = hashlib.sha256(data).hexdigest()
+        if src_sha == self._src_sha:
+            report.set("read_skipped", True)
+            return
+        with report.stage("parse"):
+            self._questions = read_bank(self.src)
+        self._src_sha = src_sha
+
+    def removed(self, compiled):
+        """qnums in the current artifact that compiled would drop."""
+        if not self.dst.exists():
+            return []
+        return diff_banks(read_bank(self.dst), compiled)["removed"]
+
+    def build(self):
+        """Rebuild the compiled bank; returns (written, report)."""
+        report = RunReport("watch_bank", source=str(self.src))
+        self.read(report)
+
+        with report.stage("overlays"):
+            overlays = load_overlays(self.overlay_dir)
+            questions = apply_overlays(self._questions, overlays)
+        report.set("overlay_patches", len(overlays))
+
+        with report.stage("compile"):
+            compiled, problems = compile_bank(questions)
+        report.set("compiled", len(compiled))
+        for key, msgs in problems.items():
+            report.warn("compile", qnum=key, messages=msgs)
+
+        with report.stage("diff"):
+            removed = [] if self.allow_removals else self.removed(compiled)
+        if removed:
+            report.set("removed", removed)
+            return False, report
+
+        with report.stage("write"):
+            written = write_compiled(compiled, self.dst, self.src.name,
+                                     self._src_sha, skip_unchanged=True)
+        if self.parquet and (written or not self.parquet.exists()):
+            with report.stage("parquet"):
+                export_parquet.export(self.dst, self.parquet)
+        return written, report
+
+
+def run_build(builder):
+    try:
+        written, report = builder.build()
+    except (OSError, ValueError) as e:
+        # Half-saved overlay or raw file; the next change retries
+        print(f"⚠️  Rebuild failed: {e}")
+        return
+    total = sum(report.stages.values()) * 1000
+    removed = report.counters.get("removed")
+    if removed:
+        shown = ", ".join(f"Q{q}" for q in removed[:10]) + (", ..." if len(removed) > 10 else "")
+        print(f"⚠️  Not writing {builder.dst.name}: the rebuild would remove {len(removed)} "
+              f"questions ({shown}). Fix the source or pass --allow-removals.")
+        return
+    status = "updated" if written else "unchanged"
+    print(f"[{time.strftime('%H:%M:%S')}] {builder.dst.name} {status}: "
+          f"{report.counters.get('compiled', 0)} questions, "
+          f"{len(report.warnings)} warnings, {total:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the compiled bank when sources change.")
+    parser.add_argument("--src", type=Path, default=DEFAULT_SRC, help="curated bank to compile")
+    parser.add_argument("--overlays", type=Path, default=DEFAULT_OVERLAYS)
+    parser.add_argument("--dst", type=Path, default=DEFAULT_DST)
+    parser.add_argument("--interval", type=float, default=1.0, help="poll interval in seconds")
+    parser.add_argument("--once", action="store_true", help="build once and exit")
+    parser.add_argument("--parquet", nargs="?", type=Path, const=export_parquet.DEFAULT_PARQUET,
+                        help="also export a Parquet copy (requires pyarrow)")
+    parser.add_argument("--allow-removals", action="store_true",
+                        help="write the rebuild even if it drops questions from the current artifact")
+    args = parser.parse_args()
+
+    if args.parquet and not export_parquet.PYARROW_AVAILABLE:
+        print("Error: --parquet requires pyarrow: pip install pyarrow")
+        sys.exit(1)
+    if args.parquet is None and export_parquet.PYARROW_AVAILABLE and parquet_sibling(args.dst).exists():
+        # An existing copy is kept in step even without --parquet
+        args.parquet = parquet_sibling(args.dst)
+
+    if not args.src.exists():
+        print(f"Error: {args.src} not found!")
+        sys.exit(1)
+
+    builder = BankBuilder(args.src, args.overlays, args.dst, args.parquet, args.allow_removals)
+    run_build(builder)
+    if args.once:
+        return
+
+    print(f"Watching {args.src.name} and {args.overlays}/*.json (Ctrl+C to stop)")
+    last = snapshot(args.src, args.overlays)
+    pending = None
+    try:
+        while True:
+            time.sleep(args.interval)
+            current = snapshot(args.src, args.overlays)
+            if current != last:
+                # Debounce: wait until the files stop changing
+                last, pending = current, True
+                continue
+            if pending:
+                pending = False
+                run_build(builder)
+    except KeyboardInterrupt:
+        print("\nStopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+"""
+Headless grading and scheduling API for LMS and mobile clients.
+
+Serves the same banks (banks.json), learner state (learner_state/) and
+attempt logs (attempt_logs/) as the Streamlit app, with the same grading
+and Leitner rules (study_core.py, scheduler.py).
+
+    GET  /health
+    GET  /banks                               -> {"core": "SnowPro Core", ...}
+    GET  /next?learner=alice&bank=core&n=10   -> next questions in spaced order, without answers
+    POST /grade                               -> grades a batch of answers
+         {"learner": "alice", "bank": "core",
+          "answers": [{"qnum": 10, "selected": ["B", "D"]}, ...]}
+         -> {"results": [{"qnum": 10, "ok": false, "correct": ["A"]}, ...], "attempted": 12, "correct": 7}
+    GET  /stats?learner=alice&bank=core       -> attempted, correct, accuracy, questions per box
+
+One asyncio process on one core. Connections are HTTP/1.1 keep-alive and
+may pipeline requests; every request that arrives in one read is
+answered with one socket write. A grade request can carry many
+answers: each answer is one comparison against the bank's precomputed
+answer bitmasks. Graded attempts are buffered and appended to the
+attempt log twice a second. Learner state goes through LearnerStore's
+write-behind, so hot learners never wait on disk.
+
+Usage:
+    python grading_api.py                     # http://127.0.0.1:8765
+    python grading_api.py --host 0.0.0.0 --port 9000
+"""
+
+import json
+import signal
+import asyncio
+import argparse
+from http import HTTPStatus
+from pathlib import Path
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from attempt_log import AttemptLog, attempt_record
+from bank_registry import BankRegistry
+from learner_history import History, letters_mask, mask_letters
+from learner_store import LearnerStore
+from scheduler import BOX_MAX
+from study_core import OPTION_LABELS, bank_version, load_bank
+
+ROOT = Path(__file__).parent
+# Same files as snowpro_app.py
+BANKS_CONFIG = ROOT / "banks.json"
+LEARNER_STATE_DIR = ROOT / "learner_state"
+ATTEMPT_LOG_DIR = ROOT / "attempt_logs"
+
+MAX_HEADER = 16 << 10
+MAX_BODY = 1 << 20
+MAX_NEXT = 100
+FLUSH_SECONDS = 30
+# Graded attempts are buffered and appended to the log in batches
+LOG_FLUSH_SECONDS = 0.5
+# How often a bank file is checked for a newer version
+RECHECK_SECONDS = 2
+
+
+class ApiError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class BankView:
+    """Arrays and client payloads for one loaded bank, built once per bank version."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.qnums = df["qnum"].to_numpy(dtype=np.int64)
+        size = int(self.qnums.max()) + 1 if len(self.qnums) else 0
+        # Dense by qnum: answer mask, and whether the qnum exists at all
+        self.key = np.zeros(size, dtype=np.uint8)
+        self.known = np.zeros(size, dtype=bool)
+        for qnum, correct in zip(self.qnums, df["correct"]):
+            self.key[qnum] = letters_mask(correct)
+            self.known[qnum] = True
+        self.cards = {}
+        for q in df.itertuples(index=False):
+            options = [{"label": lab, "text": str(getattr(q, lab, "") or "").strip()} for lab in OPTION_LABELS]
+            self.cards[int(q.qnum)] = {
+                "qnum": int(q.qnum),
+                "question": q.question,
+                "options": [o for o in options if o["text"]],
+                "multi": bool(q.multi),
+            }
+
+    def next_qnums(self, hist: History, n: int) -> List[int]:
+        """The n questions the app's Spaced Repetition mode would show first."""
+        prio = hist.priorities(self.qnums)
+        order = np.lexsort((self.qnums, prio))[:n]
+        return self.qnums[order].tolist()
+
+
+class GradingService:
+    """Request handlers; everything runs on the event loop thread."""
+
+    def __init__(self, registry: BankRegistry, store: LearnerStore, log: AttemptLog):
+        self.registry = registry
+        self.store = store
+        self.log = log
+        self.views: Dict[str, BankView] = {}
+        self.stats = {"requests": 0, "graded": 0}
+        self.pending_log: List[Dict] = []
+
+    def view(self, bank_id: str) -> BankView:
+        if bank_id not in self.registry.banks:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"unknown bank {bank_id!r}")
+        df = self.registry.get(bank_id)
+        view = self.views.get(bank_id)
+        if view is None or view.df is not df:
+            view = self.views[bank_id] = BankView(df)
+        return view
+
+    def history(self, learner: str, bank_id: str) -> Tuple[Dict, History]:
+        if not learner:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "learner is required")
+        try:
+            state = self.store.get(learner)
+        except ValueError as e:
+            raise ApiError(HTTPStatus.BAD_REQUEST, str(e))
+        return state, state.setdefault(bank_id, History())
+
+    def next_questions(self, query: Dict) -> Dict:
+        bank_id = query.get("bank", "core")
+        view = self.view(bank_id)
+        _, hist = self.history(query.get("learner", ""), bank_id)
+        try:
+            n = min(max(int(query.get("n", 10)), 1), MAX_NEXT)
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "n must be an integer")
+        return {"bank": bank_id, "questions": [view.cards[q] for q in view.next_qnums(hist, n)]}
+
+    def grade(self, body: Dict) -> Dict:
+        bank_id = body.get("bank", "core")
+        learner = str(body.get("learner", ""))
+        answers = body.get("answers")
+        if not isinstance(answers, list):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "answers must be a list")
+        view = self.view(bank_id)
+        state, hist = self.history(learner, bank_id)
+
+        results, logged = [], []
+        for a in answers:
+            try:
+                qnum = int(a["qnum"])
+                picks = a.get("selected", [])
+                if not isinstance(picks, list) or not all(isinstance(c, str) for c in picks):
+                    raise TypeError("selected must be a list of letters")
+                selected = sorted({c.upper() for c in picks})
+                # ValueError unless every pick is exactly one of A-F
+                mask = letters_mask(selected)
+            except (KeyError, TypeError, ValueError):
+                results.append({"qnum": a.get("qnum") if isinstance(a, dict) else None, "error": "bad answer"})
+                continue
+            if not (0 <= qnum < len(view.known) and view.known[qnum]):
+                results.append({"qnum": qnum, "error": "unknown question"})
+                continue
+            key = int(view.key[qnum])
+            ok = mask == key
+            hist.record(qnum, selected, ok)
+            results.append({"qnum": qnum, "ok": ok, "correct": mask_letters(key)})
+            logged.append(attempt_record(learner, bank_id, qnum, selected, ok))
+
+        if logged:
+            self.store.mark_dirty(learner, state)
+            self.pending_log += logged
+            self.stats["graded"] += len(logged)
+        return {"results": results, "attempted": len(hist), "correct": hist.correct_count()}
+
+    def learner_stats(self, query: Dict) -> Dict:
+        bank_id = query.get("bank", "core")
+        self.view(bank_id)
+        _, hist = self.history(query.get("learner", ""), bank_id)
+        attempted, correct = len(hist), hist.correct_count()
+        boxes = np.bincount(hist.data["box"][hist.qnums()], minlength=BOX_MAX + 1)
+        return {
+            "bank": bank_id,
+            "attempted": attempted,
+            "correct": correct,
+            "accuracy": round(correct / attempted, 4) if attempted else 0.0,
+            "boxes": boxes.tolist(),
+        }
+
+    def flush_log(self):
+        if self.pending_log:
+            batch, self.pending_log = self.pending_log, []
+            self.log.extend(batch)
+
+    def dispatch(self, method: str, target: str, body: bytes) -> Tuple[HTTPStatus, Dict]:
+        self.stats["requests"] += 1
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        routes = {
+            ("GET", "/health"): lambda: {"ok": True, **self.stats, "hot_learners": self.store.hot_count()},
+            ("GET", "/banks"): lambda: self.registry.titles(),
+            ("GET", "/next"): lambda: self.next_questions(query),
+            ("GET", "/stats"): lambda: self.learner_stats(query),
+            ("POST", "/grade"): lambda: self.grade(parse_json(body)),
+        }
+        handler = routes.get((method, url.path))
+        if handler is None:
+            if any(path == url.path for _, path in routes):
+                raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed on {url.path}")
+            raise ApiError(HTTPStatus.NOT_FOUND, f"no route {url.path}")
+        return HTTPStatus.OK, handler()
+
+
+def parse_json(body: bytes) -> Dict:
+    try:
+        data = json.loads(body or b"{}")
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "body is not valid JSON")
+    if not isinstance(data, dict):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "body must be a JSON object")
+    return data
+
+
+def response(status: HTTPStatus, payload: Dict, keep_alive: bool) -> bytes:
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+
+class HttpProtocol(asyncio.Protocol):
+    """Minimal HTTP/1.1 server side: keep-alive, pipelining, JSON bodies
+    framed by Content-Length (requests with a Transfer-Encoding get a 501).
+
+    Every request that arrived in one read is handled in turn, and all
+    their responses are written with a single transport.write().
+    """
+
+    def __init__(self, service: GradingService):
+        self.service = service
+        self.buf = bytearray()
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def pause_writing(self):
+        # The client isn't reading its responses; stop reading its requests
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        self.transport.resume_reading()
+
+    def data_received(self, data: bytes):
+        self.buf += data
+        out, close = [], False
+        while not close:
+            end = self.buf.find(b"\r\n\r\n")
+            if end < 0:
+                if len(self.buf) > MAX_HEADER:
+                    out.append(response(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, {"error": "headers too large"}, False))
+                    close = True
+                break
+            lines = self.buf[:end].decode("latin-1").split("\r\n")
+            try:
+                method, target, version = lines[0].split(" ", 2)
+            except ValueError:
+                out.append(response(HTTPStatus.BAD_REQUEST, {"error": "bad request line"}, False))
+                close = True
+                break
+            headers = {}
+            for line in lines[1:]:
+                name, sep, value = line.partition(":")
+                if sep:
+                    headers[name.strip().lower()] = value.strip()
+            if "transfer-encoding" in headers:
+                # Bodies are only framed by Content-Length; reading a chunked
+                # body as length 0 would parse its chunks as the next request
+                out.append(response(HTTPStatus.NOT_IMPLEMENTED,
+                                    {"error": "Transfer-Encoding is not supported; send Content-Length"}, False))
+                close = True
+                break
+            length = headers.get("content-length", "0")
+            if not length.isdigit() or int(length) > MAX_BODY:
+                out.append(response(HTTPStatus.BAD_REQUEST, {"error": "bad or too large Content-Length"}, False))
+                close = True
+                break
+            start, stop = end + 4, end + 4 + int(length)
+            if len(self.buf) < stop:
+                break  # body still arriving
+            body = bytes(self.buf[start:stop])
+            del self.buf[:stop]
+
+            connection = headers.get("connection", "").lower()
+            keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+            try:
+                status, payload = self.service.dispatch(method, target, body)
+            except ApiError as e:
+                status, payload = e.status, {"error": str(e)}
+            except Exception as e:
+                print(f"⚠️  {method} {target}: {e!r}")
+                status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "internal error"}
+            out.append(response(status, payload, keep_alive))
+            close = not keep_alive
+        if out:
+            self.transport.write(b"".join(out))
+        if close:
+            self.transport.close()
+
+
+async def run_periodically(seconds: float, fn):
+    while True:
+        await asyncio.sleep(seconds)
+        fn()
+
+
+async def serve(host: str, port: int, service: GradingService):
+    loop = asyncio.get_running_loop()
+    server = await loop.create_server(lambda: HttpProtocol(service), host, port)
+    tasks = [asyncio.ensure_future(run_periodically(LOG_FLUSH_SECONDS, service.flush_log)),
+             asyncio.ensure_future(run_periodically(FLUSH_SECONDS, service.store.flush))]
+    # Stop cleanly on SIGTERM as well as Ctrl-C, so buffered state is written
+    stopped = loop.create_future()
+    try:
+        loop.add_signal_handler(signal.SIGTERM, stopped.set_result, None)
+    except NotImplementedError:
+        pass
+    print(f"✅ Grading API on http://{host}:{port} ({', '.join(service.registry.banks)})")
+    try:
+        async with server:
+            await stopped
+    finally:
+        for task in tasks:
+            task.cancel()
+        service.flush_log()
+        service.store.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless grading and scheduling API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--banks", type=Path, default=BANKS_CONFIG)
+    args = parser.parse_args()
+
+    registry = BankRegistry.from_config(args.banks, loader=load_bank, version_fn=bank_version,
+                                        recheck_seconds=RECHECK_SECONDS)
+    service = GradingService(registry, LearnerStore(LEARNER_STATE_DIR), AttemptLog(ATTEMPT_LOG_DIR))
+    # Load every bank up front so the first request doesn't pay for it
+    for bank_id in registry.banks:
+        service.view(bank_id)
+
+    try:
+        asyncio.run(serve(args.host, args.port, service))
+    except KeyboardInterrupt:
+        print("\nStopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Item analysis over the attempt logs of all learners.
+
+For every question in every bank:
+
+    n               learners who attempted it
+    p               share who got it right (difficulty; high = easy)
+    r_pb            corrected point-biserial discrimination: correlation
+                    between getting this item right and the learner's
+                    accuracy on the *other* items they attempted
+    choices         how often each option A-F was picked
+    flags           too_easy / too_hard / low_discrimination / suspect_key
+
+By default only a learner's first attempt at a question counts, so
+repeated drilling does not inflate p. All group-bys are NumPy bincounts
+over integer-coded arrays, so millions of attempts take seconds, most of
+it spent parsing the logs.
+
+The app shows the cohort results next to a learner's misses in the Score
+Report once item_stats.json exists.
+
+Usage:
+    python item_analytics.py                          # attempt_logs/ -> item_stats.json
+    python item_analytics.py --attempts last --min-n 50
+    python item_analytics.py --logs other_logs --out other_stats.json --show 20
+"""
+
+import os
+import json
+import time
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from attempt_log import iter_attempts
+from data_extract.bank_io import read_bank
+from learner_history import OPTION_LABELS, letters_mask
+
+ROOT = Path(__file__).parent
+DEFAULT_LOGS = ROOT / "attempt_logs"
+DEFAULT_OUT = ROOT / "item_stats.json"
+BANKS_CONFIG = ROOT / "banks.json"
+
+TOO_EASY = 0.90
+TOO_HARD = 0.30
+LOW_DISCRIMINATION = 0.10
+DEFAULT_MIN_N = 20
+
+
+def selected_masks(selected: np.ndarray) -> np.ndarray:
+    """Array of letter strings ("BD") -> uint8 bitmasks (bit 0 = A)."""
+    uniq, inverse = np.unique(selected, return_inverse=True)
+    masks = np.array([letters_mask(set(s).intersection(OPTION_LABELS)) for s in uniq], dtype=np.uint8)
+    return masks[inverse]
+
+
+def load_attempts(logs: Path) -> Dict[str, np.ndarray]:
+    """Columns of every logged attempt: ts, learner, bank, qnum, mask, ok."""
+    ts, learner, bank, qnum, selected, ok = [], [], [], [], [], []
+    for rec in iter_attempts(logs):
+        ts.append(rec["ts"])
+        learner.append(rec["learner"])
+        bank.append(rec["bank"])
+        qnum.append(rec["qnum"])
+        selected.append(rec.get("selected", ""))
+        ok.append(rec["ok"])
+    return {
+        "ts": np.array(ts, dtype=np.float64),
+        "learner": np.array(learner, dtype=object),
+        "bank": np.array(bank, dtype=object),
+        "qnum": np.array(qnum, dtype=np.int32),
+        "mask": selected_masks(np.array(selected, dtype=object)) if selected else np.zeros(0, np.uint8),
+        "ok": np.array(ok, dtype=bool),
+    }
+
+
+def pick_attempts(learner_idx: np.ndarray, item_idx: np.ndarray, ts: np.ndarray,
+                  n_items: int, which: str) -> np.ndarray:
+    """Row indices to keep: each learner's first or last attempt per item, or all."""
+    if which == "all":
+        return np.arange(len(ts))
+    order = np.lexsort((ts, learner_idx))
+    if which == "last":
+        order = order[::-1]
+    pair = learner_idx[order].astype(np.int64) * n_items + item_idx[order]
+    _, first = np.unique(pair, return_index=True)
+    return np.sort(order[first])
+
+
+def analyze(cols: Dict[str, np.ndarray], which: str = "first") -> Dict:
+    """Per-item statistics for one bank's attempt columns."""
+    learners, learner_idx = np.unique(cols["learner"], return_inverse=True)
+    items, item_idx = np.unique(cols["qnum"], return_inverse=True)
+    keep = pick_attempts(learner_idx, item_idx, cols["ts"], len(items), which)
+    learner_idx, item_idx = learner_idx[keep], item_idx[keep]
+    ok = cols["ok"][keep].astype(np.float64)
+    mask = cols["mask"][keep]
+    n_items = len(items)
+
+    n = np.bincount(item_idx, minlength=n_items)
+    n_ok = np.bincount(item_idx, weights=ok, minlength=n_items)
+    p = np.divide(n_ok, n, out=np.zeros(n_items), where=n > 0)
+
+    # Rest score: the learner's accuracy on everything except this attempt
+    l_n = np.bincount(learner_idx)[learner_idx]
+    l_ok = np.bincount(learner_idx, weights=ok)[learner_idx]
+    has_rest = l_n > 1
+    rest = np.divide(l_ok - ok, l_n - 1, out=np.zeros(len(ok)), where=has_rest)
+
+    w = has_rest.astype(np.float64)
+    m = np.bincount(item_idx, weights=w, minlength=n_items)
+    m_ok = np.bincount(item_idx, weights=w * ok, minlength=n_items)
+    s = np.bincount(item_idx, weights=w * rest, minlength=n_items)
+    s2 = np.bincount(item_idx, weights=w * rest * rest, minlength=n_items)
+    s_ok = np.bincount(item_idx, weights=w * ok * rest, minlength=n_items)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean1 = s_ok / m_ok
+        mean0 = (s - s_ok) / (m - m_ok)
+        sd = np.sqrt(s2 / m - (s / m) ** 2)
+        pr = m_ok / m
+        r_pb = (mean1 - mean0) / sd * np.sqrt(pr * (1 - pr))
+    r_pb = np.where(np.isfinite(r_pb), r_pb, np.nan)
+
+    choices = np.stack([np.bincount(item_idx, weights=(mask >> b) & 1, minlength=n_items)
+                        for b in range(len(OPTION_LABELS))], axis=1).astype(np.int64)
+
+    return {
+        "qnum": items, "n": n, "p": p, "r_pb": r_pb, "choices": choices,
+        "learners": len(learners), "attempts": len(keep),
+    }
+
+
+def flag_item(p: float, r_pb: float, choices: List[int], key: List[str], n: int, min_n: int) -> List[str]:
+    if n < min_n:
+        return []
+    flags = []
+    if p > TOO_EASY:
+        flags.append("too_easy")
+    if p < TOO_HARD:
+        flags.append("too_hard")
+    if not np.isnan(r_pb):
+        if r_pb < 0:
+            flags.append("suspect_key")
+        elif r_pb < LOW_DISCRIMINATION:
+            flags.append("low_discrimination")
+    # A distractor that beats the keyed answer is the other sign of a bad key
+    key_idx = [OPTION_LABELS.index(c) for c in key if c in OPTION_LABELS]
+    others = [choices[i] for i in range(len(OPTION_LABELS)) if i not in key_idx]
+    if key_idx and others and max(others) > min(choices[i] for i in key_idx) \
+            and "suspect_key" not in flags:
+        flags.append("suspect_key")
+    return flags
+
+
+def bank_keys(config: Path = BANKS_CONFIG) -> Dict[str, Dict[int, List[str]]]:
+    """bank id -> {qnum: answer letters}, read from each bank's raw file."""
+    banks = [{"id": "core", "path": "snowpro_questions.json"}]
+    if config.exists():
+        with open(config, "r", encoding="utf-8") as f:
+            banks = json.load(f).get("banks", banks)
+    keys = {}
+    for bank in banks:
+        path = config.parent / bank["path"]
+        if path.exists():
+            keys[bank["id"]] = {int(q["qnum"]): sorted(str(c).upper() for c in (q.get("correct") or []))
+                                for q in read_bank(path)}
+    return keys
+
+
+def item_stats(logs: Path = DEFAULT_LOGS, which: str = "first", min_n: int = DEFAULT_MIN_N) -> Dict:
+    """{bank id: {"learners", "attempts", "items": {qnum: stats}}} for every bank in the logs."""
+    cols = load_attempts(logs)
+    keys = bank_keys()
+    out = {}
+    for bank in np.unique(cols["bank"]):
+        sel = cols["bank"] == bank
+        res = analyze({k: v[sel] for k, v in cols.items()}, which)
+        key = keys.get(bank, {})
+        items = {}
+        for i, qnum in enumerate(res["qnum"].tolist()):
+            r = float(res["r_pb"][i])
+            choices = res["choices"][i].tolist()
+            items[str(qnum)] = {
+                "n": int(res["n"][i]),
+                "p": round(float(res["p"][i]), 4),
+                "r_pb": None if np.isnan(r) else round(r, 4),
+                "choices": dict(zip(OPTION_LABELS, choices)),
+                "flags": flag_item(float(res["p"][i]), r, choices, key.get(qnum, []),
+                                   int(res["n"][i]), min_n),
+            }
+        out[bank] = {"learners": res["learners"], "attempts": res["attempts"], "items": items}
+    return out
+
+
+def write_stats(stats: Dict, dst: Path, which: str, min_n: int):
+    doc = {"built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+           "attempts_counted": which, "min_n": min_n, "banks": stats}
+    fd, tmp = tempfile.mkstemp(prefix=f".{dst.name}.", suffix=".tmp", dir=dst.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, dst)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Difficulty / discrimination / distractor analysis of attempt logs.")
+    parser.add_argument("--logs", type=Path, default=DEFAULT_LOGS)
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT)
+    parser.add_argument("--attempts", choices=["first", "last", "all"], default="first",
+                        help="which attempts per learner and question to count (default: first)")
+    parser.add_argument("--min-n", type=int, default=DEFAULT_MIN_N,
+                        help="minimum learners per question before it is flagged")
+    parser.add_argument("--show", type=int, default=10, help="flagged questions to print per bank")
+    args = parser.parse_args()
+
+    if not args.logs.exists():
+        print(f"Error: {args.logs} not found!")
+        return
+
+    t0 = time.perf_counter()
+    stats = item_stats(args.logs, args.attempts, args.min_n)
+    elapsed = time.perf_counter() - t0
+    write_stats(stats, args.out, args.attempts, args.min_n)
+
+    for bank, res in stats.items():
+        flagged = [(q, s) for q, s in res["items"].items() if s["flags"]]
+        print(f"\n{bank}: {res['attempts']} attempts by {res['learners']} learners, "
+              f"{len(res['items'])} questions, {len(flagged)} flagged")
+        flagged.sort(key=lambda qs: (qs[1]["r_pb"] if qs[1]["r_pb"] is not None else 1.0))
+        for qnum, s in flagged[:args.show]:
+            print(f"  ⚠️  Q{qnum}: p={s['p']:.2f} r_pb={s['r_pb']} {', '.join(s['flags'])}")
+    print(f"\n✅ Saved item statistics to {args.out} ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Compact study history of one learner on one bank.
+
+Six bytes per question in a single NumPy structured array, indexed by
+qnum (qnums are small, so the array stays dense and history survives
+bank rebuilds that add or reorder questions):
+
+    box   int8    Leitner box (scheduler.py)
+    bits  uint8   bits 0-5  options picked on the last check (bit 0 = A)
+                  bit 6     last check was correct
+                  bit 7     attempted
+    ts    uint32  when the last check happened (Unix seconds; 0 = unknown)
+
+The timestamp lets two copies of a learner's history (e.g. from two
+devices) be merged question by question, keeping the newer check.
+
+The answer key is not stored; it comes from the bank. Serializing is a
+single buffer copy of the array:
+
+    hist = History()
+    hist.record(10, ["B", "D"], ok=False)
+    History.from_bytes(hist.to_bytes()).get(10)
+    # {"box": 0, "last_ok": False, "correct": False, "selected": ["B", "D"], "ts": 1792368000}
+"""
+
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from scheduler import box_table, priority_table
+
+OPTION_LABELS = "ABCDEF"
+RECORD = np.dtype([("box", "i1"), ("bits", "u1"), ("ts", "<u4")])
+SELECTED_BITS = 0x3F
+OK_BIT = 0x40
+SEEN_BIT = 0x80
+
+_PRIORITY = priority_table()
+_NEXT_BOX = box_table()
+_LETTER_BITS = {lab: 1 << i for i, lab in enumerate(OPTION_LABELS)}
+
+
+def letters_mask(letters) -> int:
+    """Bit mask of option letters; anything but a single "A"-"F" raises ValueError."""
+    mask = 0
+    for c in letters:
+        try:
+            mask |= _LETTER_BITS[c]
+        except (KeyError, TypeError):
+            raise ValueError(f"not an option letter: {c!r}") from None
+    return mask
+
+
+def mask_letters(mask: int) -> List[str]:
+    return [lab for i, lab in enumerate(OPTION_LABELS) if mask >> i & 1]
+
+
+class History:
+    """Per-question box, last result and last pick for one learner and bank."""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: Optional[np.ndarray] = None):
+        self.data = data if data is not None else np.zeros(0, dtype=RECORD)
+
+    @classmethod
+    def from_bytes(cls, buf) -> "History":
+        return cls(np.frombuffer(buf, dtype=RECORD).copy())
+
+    def to_bytes(self) -> bytes:
+        return self.data.tobytes()
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    def _reserve(self, qnum: int):
+        if qnum >= len(self.data):
+            grown = np.zeros(max(qnum + 1, 2 * len(self.data)), dtype=RECORD)
+            grown[:len(self.data)] = self.data
+            self.data = grown
+
+    def record(self, qnum: int, selected: List[str], ok: bool, ts: Optional[float] = None):
+        """Store the result of a check and move the question's Leitner box."""
+        self._reserve(qnum)
+        box = int(self.data["box"][qnum])
+        self.data["box"][qnum] = _NEXT_BOX[box, int(ok)]
+        self.data["bits"][qnum] = SEEN_BIT | (OK_BIT if ok else 0) | letters_mask(selected)
+        self.data["ts"][qnum] = int(time.time() if ts is None else ts)
+
+    def merge(self, other: "History") -> int:
+        """Take every question other has checked more recently (or at all, if this side hasn't).
+
+        One vectorized pass over both arrays; returns how many questions were taken.
+        """
+        n = len(other.data)
+        if n == 0:
+            return 0
+        self._reserve(n - 1)
+        mine, theirs = self.data[:n], other.data
+        take = (theirs["bits"] & SEEN_BIT) != 0
+        take &= ((mine["bits"] & SEEN_BIT) == 0) | (theirs["ts"] > mine["ts"])
+        mine[take] = theirs[take]
+        return int(np.count_nonzero(take))
+
+    def get(self, qnum: int) -> Optional[Dict]:
+        """History of one question, or None if it was never checked."""
+        if qnum not in self:
+            return None
+        box, bits, ts = self.data[qnum]
+        ok = bool(bits & OK_BIT)
+        return {"box": int(box), "last_ok": ok, "correct": ok, "selected": mask_letters(bits & SELECTED_BITS),
+                "ts": int(ts)}
+
+    def __contains__(self, qnum: int) -> bool:
+        return 0 <= qnum < len(self.data) and bool(self.data["bits"][qnum] & SEEN_BIT)
+
+    def __len__(self) -> int:
+        """Number of questions attempted."""
+        return int(np.count_nonzero(self.data["bits"] & SEEN_BIT))
+
+    def correct_count(self) -> int:
+        both = SEEN_BIT | OK_BIT
+        return int(np.count_nonzero((self.data["bits"] & both) == both))
+
+    def qnums(self, ok: Optional[bool] = None) -> np.ndarray:
+        """Attempted qnums, optionally only those last answered right (ok=True) or wrong."""
+        bits = self.data["bits"]
+        keep = (bits & SEEN_BIT) != 0
+        if ok is not None:
+            keep &= ((bits & OK_BIT) != 0) == ok
+        return np.flatnonzero(keep)
+
+    def priorities(self, qnums: np.ndarray) -> np.ndarray:
+        """scheduler.spaced_priority for many questions at once."""
+        qnums = np.asarray(qnums, dtype=np.int64)
+        inside = qnums < len(self.data)
+        box = np.zeros(len(qnums), dtype=np.int64)
+        state = np.zeros(len(qnums), dtype=np.int64)   # index into scheduler.LAST_OK_STATES
+        rec = self.data[qnums[inside]]
+        box[inside] = rec["box"]
+        state[inside] = np.where(rec["bits"] & SEEN_BIT, np.where(rec["bits"] & OK_BIT, 2, 1), 0)
+        return _PRIORITY[state, box]
@@ -0,0 +1,214 @@
+"""
+Shared per-learner study state with a bounded in-memory hot set.
+
+State for every registered learner lives on disk (one binary file per
+learner under learner_state/). Learners who are actively studying are
+kept in memory in an LRU hot set; the hot set is capped by count and by
+idle time, and learners falling out of it are flushed to disk (if they
+changed) and dropped. A returning learner is rehydrated from disk on the
+next access. Dirty learners are also written behind periodically so a
+crash loses at most `flush_seconds` of history.
+
+State shape: {bank_id: learner_history.History}
+
+    store = LearnerStore("learner_state")
+    state = store.get("alice")
+    state.setdefault("core", History()).record(10, ["B"], ok=True)
+    store.mark_dirty("alice", state)
+
+File layout: MAGIC, then per bank a little-endian u16 id length, the
+UTF-8 id, a u32 byte count and the bank's History buffer.
+
+File names map back to learner ids: characters outside A-Z a-z 0-9 . @ -
+are %XX-escaped (UTF-8), so every id gets a file of its own.
+"""
+
+import os
+import time
+import struct
+import string
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+from urllib.parse import unquote
+
+from learner_history import History
+
+MAGIC = b"SPLS2\n"
+DEFAULT_MAX_HOT = 1000
+DEFAULT_IDLE_SECONDS = 15 * 60
+DEFAULT_FLUSH_SECONDS = 30
+
+# Longest file name stem, leaving room for the suffix within 255 bytes
+MAX_NAME = 240
+
+_PLAIN_ID_CHARS = frozenset(string.ascii_letters + string.digits + ".@-")
+
+
+def id_to_name(learner_id: str) -> str:
+    """File name stem for a learner id; name_to_id() reverses it."""
+    name = "".join(c if c in _PLAIN_ID_CHARS else "".join(f"%{b:02X}" for b in c.encode("utf-8"))
+                   for c in learner_id)
+    if name.startswith("."):
+        name = "%2E" + name[1:]
+    if not name:
+        raise ValueError("learner id is empty")
+    if len(name) > MAX_NAME:
+        raise ValueError(f"learner id is too long: {learner_id[:20]!r}...")
+    return name
+
+
+def name_to_id(name: str) -> str:
+    """Learner id for a file name stem written by id_to_name()."""
+    return unquote(name, errors="strict")
+
+
+def encode_state(state: Dict[str, History]) -> bytes:
+    parts = [MAGIC]
+    for bank, hist in state.items():
+        bank_b = bank.encode("utf-8")
+        buf = hist.to_bytes()
+        parts += [struct.pack("<H", len(bank_b)), bank_b, struct.pack("<I", len(buf)), buf]
+    return b"".join(parts)
+
+
+def decode_state(data: bytes) -> Dict[str, History]:
+    if not data.startswith(MAGIC):
+        raise ValueError("not a learner state file")
+    state, pos = {}, len(MAGIC)
+    while pos < len(data):
+        (n,) = struct.unpack_from("<H", data, pos)
+        bank = data[pos + 2:pos + 2 + n].decode("utf-8")
+        pos += 2 + n
+        (size,) = struct.unpack_from("<I", data, pos)
+        state[bank] = History.from_bytes(data[pos + 4:pos + 4 + size])
+        pos += 4 + size
+    return state
+
+
+class LearnerStore:
+    """Disk-backed learner state with an LRU/TTL-bounded hot set. Thread-safe."""
+
+    def __init__(self, root, max_hot: int = DEFAULT_MAX_HOT,
+                 idle_seconds: float = DEFAULT_IDLE_SECONDS,
+                 flush_seconds: float = DEFAULT_FLUSH_SECONDS):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_hot = max_hot
+        self.idle_seconds = idle_seconds
+        self.flush_seconds = flush_seconds
+        # learner id -> [state, last_used, dirty_since or None]
+        self._hot = OrderedDict()
+        # learner id -> dirty_since, oldest first, for write-behind
+        self._dirty = OrderedDict()
+        self._lock = threading.RLock()
+        self.stats = {"hits": 0, "rehydrated": 0, "flushed": 0, "evicted": 0}
+
+    def path_for(self, learner_id: str) -> Path:
+        """State file for a learner; raises ValueError for ids too long for a file name."""
+        return self.root / f"{id_to_name(learner_id)}.bin"
+
+    def get(self, learner_id: str) -> Dict:
+        """State for a learner, rehydrating it from disk if it is not hot."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._hot.get(learner_id)
+            if entry is not None:
+                entry[1] = now
+                self._hot.move_to_end(learner_id)
+                self.stats["hits"] += 1
+            else:
+                entry = [self._read(learner_id), now, None]
+                self._hot[learner_id] = entry
+                self.stats["rehydrated"] += 1
+            self._sweep(now, keep=learner_id)
+            return entry[0]
+
+    def mark_dirty(self, learner_id: str, state: Dict):
+        """Record that a learner's state changed (re-inserting it if it was evicted)."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._hot.get(learner_id)
+            if entry is None:
+                entry = self._hot[learner_id] = [state, now, None]
+            entry[0], entry[1] = state, now
+            if entry[2] is None:
+                entry[2] = now
+                self._dirty[learner_id] = now
+            self._hot.move_to_end(learner_id)
+            self._sweep(now, keep=learner_id)
+
+    def reset(self, learner_id: str):
+        """Forget a learner's history, in memory and on disk."""
+        with self._lock:
+            self._hot.pop(learner_id, None)
+            self._dirty.pop(learner_id, None)
+            path = self.path_for(learner_id)
+            if path.exists():
+                path.unlink()
+
+    def flush(self, learner_id: str = None):
+        """Write dirty state to disk (one learner or all)."""
+        with self._lock:
+            ids = [learner_id] if learner_id is not None else list(self._hot)
+            for lid in ids:
+                entry = self._hot.get(lid)
+                if entry is not None and entry[2] is not None:
+                    self._write(lid, entry[0])
+                    entry[2] = None
+                    self._dirty.pop(lid, None)
+
+    def iter_stored(self) -> Iterator[Tuple[str, Dict]]:
+        """(learner id, state) for every learner on disk. Unflushed changes are not included."""
+        for path in sorted(self.root.glob("*.bin")):
+            with open(path, "rb") as f:
+                yield name_to_id(path.stem), decode_state(f.read())
+
+    def hot_count(self) -> int:
+        return len(self._hot)
+
+    def _sweep(self, now: float, keep: str):
+        # Write-behind for learners that have been dirty for a while; the
+        # dirty queue is oldest first, so this stops at the first young one
+        while self._dirty:
+            lid, since = next(iter(self._dirty.items()))
+            if now - since < self.flush_seconds:
+                break
+            del self._dirty[lid]
+            entry = self._hot.get(lid)
+            if entry is not None and entry[2] is not None:
+                self._write(lid, entry[0])
+                entry[2] = None
+        # Hot set is ordered least recently used first: evict from the front
+        # while it is over the cap or the learner has gone idle
+        for lid in list(self._hot):
+            if lid == keep:
+                continue
+            if len(self._hot) <= self.max_hot and now - self._hot[lid][1] <= self.idle_seconds:
+                break
+            entry = self._hot.pop(lid)
+            if entry[2] is not None:
+                self._write(lid, entry[0])
+                self._dirty.pop(lid, None)
+            self.stats["evicted"] += 1
+
+    def _read(self, learner_id: str) -> Dict:
+        path = self.path_for(learner_id)
+        if not path.exists():
+            return {}
+        with open(path, "rb") as f:
+            return decode_state(f.read())
+
+    def _write(self, learner_id: str, state: Dict):
+        path = self.path_for(learner_id)
+        fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=self.root)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(encode_state(state))
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        self.stats["flushed"] += 1
@@ -0,0 +1,258 @@
+"""
+Cohort "most missed" rankings, kept up to date from the attempt logs.
+
+For every bank this tracks, across all learners:
+
+    questions   the questions with the most wrong checks
+    answers     the wrong answers picked most often, keyed by
+                (qnum, selected letters), e.g. Q10 answered "BD"
+    attempts    checks per question, for the miss rate
+
+Rankings are updated incrementally: the tracker remembers a byte offset
+into each attempts-*.ndjson file and only parses lines appended since the
+last refresh, so keeping the view current costs as much as the new
+attempts, not the whole history. State (counters plus offsets) is saved
+to miss_rankings.json so the next process carries on from there.
+
+The two rankings are Space-Saving top-k sketches: at most `capacity`
+counters each, kept in a min-heap. Until a bank has more distinct keys
+than that, counts are exact; past it, the least-counted key is replaced
+and counts become upper bounds, off by at most the `error` reported
+next to them. Memory stays fixed however large the cohort grows.
+
+Usage:
+    python miss_rankings.py                       # refresh from attempt_logs/, print top 10 per bank
+    python miss_rankings.py --show 25 --capacity 20000
+    python miss_rankings.py --rebuild             # forget saved state and rescan every log
+"""
+
+import os
+import json
+import heapq
+import argparse
+import tempfile
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Hashable, List, Tuple
+
+ROOT = Path(__file__).parent
+DEFAULT_LOGS = ROOT / "attempt_logs"
+DEFAULT_STATE = ROOT / "miss_rankings.json"
+DEFAULT_CAPACITY = 5000
+
+
+class TopK:
+    """Space-Saving heavy hitters: bounded counters, exact until capacity is exceeded."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.counts: Dict[Hashable, int] = {}
+        self.errors: Dict[Hashable, int] = {}
+        # (count when pushed, key) for every tracked key. Counts only grow, so
+        # an entry is at most stale-low; it is refreshed when it reaches the top
+        self._heap: List[Tuple[int, Hashable]] = []
+
+    def add(self, key: Hashable, n: int = 1):
+        if key in self.counts:
+            self.counts[key] += n
+            return
+        if len(self.counts) < self.capacity:
+            self.counts[key] = n
+            self.errors[key] = 0
+            heapq.heappush(self._heap, (n, key))
+            return
+        # Full: the new key takes over the smallest counter
+        while True:
+            count, victim = self._heap[0]
+            if count == self.counts[victim]:
+                break
+            heapq.heapreplace(self._heap, (self.counts[victim], victim))
+        del self.counts[victim], self.errors[victim]
+        self.counts[key] = count + n
+        self.errors[key] = count
+        heapq.heapreplace(self._heap, (count + n, key))
+
+    def top(self, n: int) -> List[Tuple[Hashable, int, int]]:
+        """(key, count, error) for the n largest counts, largest first."""
+        best = heapq.nlargest(n, self.counts.items(), key=lambda kv: kv[1])
+        return [(key, count, self.errors[key]) for key, count in best]
+
+    @property
+    def exact(self) -> bool:
+        return not any(self.errors.values())
+
+    def to_list(self) -> List:
+        return [[key, count, self.errors[key]] for key, count in self.counts.items()]
+
+    @classmethod
+    def from_list(cls, items: List, capacity: int, key_fn=lambda k: k) -> "TopK":
+        sketch = cls(capacity)
+        for key, count, error in items:
+            key = key_fn(key)
+            sketch.counts[key] = count
+            sketch.errors[key] = error
+        sketch._heap = [(count, key) for key, count in sketch.counts.items()]
+        heapq.heapify(sketch._heap)
+        return sketch
+
+
+class BankMisses:
+    """Counters for one bank."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.attempts = Counter()          # qnum -> checks (bounded by bank size)
+        self.questions = TopK(capacity)    # qnum -> wrong checks
+        self.answers = TopK(capacity)      # (qnum, letters) -> times picked, wrong
+
+    def add(self, qnum: int, selected: str, ok: bool):
+        self.attempts[qnum] += 1
+        if not ok:
+            self.questions.add(qnum)
+            if selected:
+                self.answers.add((qnum, selected))
+
+    def to_dict(self) -> Dict:
+        return {
+            "attempts": {str(q): n for q, n in self.attempts.items()},
+            "questions": self.questions.to_list(),
+            "answers": self.answers.to_list(),
+        }
+
+    @classmethod
+    def from_dict(cls, raw: Dict, capacity: int) -> "BankMisses":
+        bank = cls(capacity)
+        bank.attempts = Counter({int(q): n for q, n in raw["attempts"].items()})
+        bank.questions = TopK.from_list(raw["questions"], capacity)
+        bank.answers = TopK.from_list(raw["answers"], capacity, key_fn=tuple)
+        return bank
+
+
+class MissRankings:
+    """Per-bank miss rankings plus how far each attempt log has been read. Thread-safe."""
+
+    def __init__(self, logs: Path = DEFAULT_LOGS, capacity: int = DEFAULT_CAPACITY):
+        self.logs = Path(logs)
+        self.capacity = capacity
+        self.banks: Dict[str, BankMisses] = {}
+        self.offsets: Dict[str, int] = {}   # log file name -> bytes consumed
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_STATE, logs: Path = DEFAULT_LOGS,
+             capacity: int = DEFAULT_CAPACITY) -> "MissRankings":
+        """Saved state if there is any, else an empty tracker that will scan every log once."""
+        rankings = cls(logs, capacity)
+        if Path(path).exists():
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            rankings.capacity = capacity = max(capacity, raw.get("capacity", 0))
+            rankings.offsets = raw["offsets"]
+            rankings.banks = {bid: BankMisses.from_dict(b, capacity) for bid, b in raw["banks"].items()}
+        return rankings
+
+    def refresh(self) -> int:
+        """Fold in attempts appended to the logs since the last refresh. Returns how many."""
+        added = 0
+        with self._lock:
+            for path in sorted(self.logs.glob("attempts-*.ndjson")):
+                start = self.offsets.get(path.name, 0)
+                if path.stat().st_size <= start:
+                    continue
+                with open(path, "rb") as f:
+                    f.seek(start)
+                    chunk = f.read()
+                # Leave a line that is still being written for next time
+                end = chunk.rfind(b"\n") + 1
+                for line in chunk[:end].splitlines():
+                    if not line.strip():
+                        continue
+                    rec = json.loads(line)
+                    bank = self.banks.get(rec["bank"])
+                    if bank is None:
+                        bank = self.banks[rec["bank"]] = BankMisses(self.capacity)
+                    bank.add(int(rec["qnum"]), rec.get("selected", ""), rec["ok"])
+                    added += 1
+                self.offsets[path.name] = start + end
+        return added
+
+    def most_missed(self, bank_id: str, n: int = 10) -> List[Dict]:
+        """Questions with the most wrong checks: qnum, misses, attempts, miss_rate, error."""
+        with self._lock:
+            bank = self.banks.get(bank_id)
+            if bank is None:
+                return []
+            rows = []
+            for qnum, misses, error in bank.questions.top(n):
+                attempts = max(bank.attempts[qnum], misses)
+                rows.append({"qnum": qnum, "misses": misses, "attempts": attempts,
+                             "miss_rate": round(misses / attempts, 3), "error": error})
+            return rows
+
+    def top_wrong_answers(self, bank_id: str, n: int = 10) -> List[Dict]:
+        """Most often picked wrong answers: qnum, selected letters, times, share of the question's checks, error."""
+        with self._lock:
+            bank = self.banks.get(bank_id)
+            if bank is None:
+                return []
+            rows = []
+            for (qnum, selected), times, error in bank.answers.top(n):
+                attempts = max(bank.attempts[qnum], times)
+                rows.append({"qnum": qnum, "selected": selected, "times": times,
+                             "share": round(times / attempts, 3), "error": error})
+            return rows
+
+    def save(self, path: Path = DEFAULT_STATE):
+        with self._lock:
+            payload = {
+                "capacity": self.capacity,
+                "offsets": dict(self.offsets),
+                "banks": {bid: b.to_dict() for bid, b in self.banks.items()},
+            }
+        path = Path(path)
+        fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f, separators=(",", ":"))
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cohort most-missed questions and wrong answers.")
+    parser.add_argument("--logs", type=Path, default=DEFAULT_LOGS)
+    parser.add_argument("--state", type=Path, default=DEFAULT_STATE)
+    parser.add_argument("--capacity", type=int, default=DEFAULT_CAPACITY,
+                        help="counters per ranking per bank (exact below this many distinct keys)")
+    parser.add_argument("--show", type=int, default=10, help="rows to print per bank")
+    parser.add_argument("--rebuild", action="store_true", help="ignore saved state and rescan all logs")
+    args = parser.parse_args()
+
+    if not args.logs.exists():
+        print(f"Error: {args.logs} not found!")
+        return
+
+    if args.rebuild:
+        rankings = MissRankings(args.logs, args.capacity)
+    else:
+        rankings = MissRankings.load(args.state, args.logs, args.capacity)
+    added = rankings.refresh()
+    rankings.save(args.state)
+    print(f"✅ Folded in {added} new attempts -> {args.state}")
+
+    for bank_id, bank in sorted(rankings.banks.items()):
+        exact = bank.questions.exact and bank.answers.exact
+        print(f"\n{bank_id}: {sum(bank.attempts.values())} attempts"
+              + ("" if exact else " (approximate: capacity exceeded)"))
+        print("  Most missed:")
+        for r in rankings.most_missed(bank_id, args.show):
+            print(f"    Q{r['qnum']:<5} {r['misses']:>7} misses / {r['attempts']:<7} ({r['miss_rate']:.0%})")
+        print("  Most picked wrong answers:")
+        for r in rankings.top_wrong_answers(bank_id, args.show):
+            print(f"    Q{r['qnum']:<5} {','.join(r['selected']):<11} {r['times']:>7} ({r['share']:.0%} of checks)")
+
+
+if __name__ == "__main__":
+    main()
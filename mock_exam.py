@@ -0,0 +1,150 @@
+"""
+Timed mock exams drawn from a bank, stratified by topic and answer type.
+
+The bank carries no topic labels, so each question is assigned one of the
+README topics by keyword. Questions are grouped into strata of
+(topic, single/multi-answer); a blueprint holds one index array per
+stratum plus each question's answer bitmask, and is built once per bank
+version. Drawing an exam allocates the exam size across strata in
+proportion to their size and samples positions from each array, so no
+DataFrame is copied or shuffled. Grading compares the learner's answer
+masks against the key masks for the whole exam at once.
+
+    bp = ExamBlueprint.from_frame(df)
+    exam = bp.draw(100, seed=7)            # positions into df
+    result = bp.grade(exam, selections)    # selections: list of letter lists
+"""
+
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from learner_history import OPTION_LABELS, letters_mask
+
+EXAM_SIZE = 100
+EXAM_MINUTES = 115
+PASS_MARK = 0.75
+
+# README topics -> keywords that identify them (first topic with the most hits wins)
+TOPICS = {
+    "Architecture & Core Concepts": ["architecture", "layer", "cloud services", "metadata", "edition"],
+    "Virtual Warehouses & Compute": ["warehouse", "multi-cluster", "credit", "compute", "auto-suspend", "scaling"],
+    "Storage & Micro-partitions": ["micro-partition", "storage", "compress", "columnar", "pruning"],
+    "Data Loading & Unloading": ["copy", "stage", "snowpipe", "load", "unload", "file format", "files"],
+    "Time Travel & Fail-safe": ["time travel", "fail-safe", "retention", "undrop", "clone", "cloning"],
+    "Clustering & Query Performance": ["cluster", "cache", "query profile", "profiler", "performance",
+                                       "materialized", "search optimization", "spill"],
+    "Security & Access Control": ["role", "privilege", "grant", "masking", "row access", "authentication",
+                                  "mfa", "network policy", "encrypt", "secure", "sso", "security"],
+    "Data Sharing & Marketplace": ["share", "sharing", "reader account", "marketplace", "listing", "provider",
+                                   "consumer"],
+    "Semi-structured Data": ["variant", "json", "semi-structured", "parquet", "avro", "flatten", "xml"],
+    "Account Management & Resource Monitors": ["resource monitor", "account_usage", "information_schema",
+                                               "account", "usage", "billing"],
+}
+OTHER_TOPIC = "Other"
+TOPIC_NAMES = list(TOPICS) + [OTHER_TOPIC]
+
+
+def topic_of(text: str) -> str:
+    """Best-matching README topic for a question's text."""
+    text = (text or "").lower()
+    best, best_hits = OTHER_TOPIC, 0
+    for topic, words in TOPICS.items():
+        hits = sum(1 for w in words if re.search(r"\b" + re.escape(w), text))
+        if hits > best_hits:
+            best, best_hits = topic, hits
+    return best
+
+
+def answer_masks(letter_lists) -> np.ndarray:
+    """[["A", "C"], ["B"], []] -> uint8 masks [0b101, 0b10, 0] (bit 0 = A)."""
+    masks = np.zeros(len(letter_lists), dtype=np.uint8)
+    for i, letters in enumerate(letter_lists):
+        picked = {str(c).upper() for c in letters}
+        masks[i] = letters_mask(picked.intersection(OPTION_LABELS))
+    return masks
+
+
+def allocate(sizes: np.ndarray, total: int) -> np.ndarray:
+    """Split total across strata in proportion to sizes (largest remainder).
+    No strata, or only empty ones, get nothing."""
+    if sizes.sum() == 0:
+        return np.zeros(len(sizes), dtype=np.int64)
+    quota = sizes / sizes.sum() * total
+    counts = np.minimum(np.floor(quota).astype(np.int64), sizes)
+    short = total - counts.sum()
+    for i in np.argsort(-(quota - counts), kind="stable"):
+        if short <= 0:
+            break
+        if counts[i] < sizes[i]:
+            counts[i] += 1
+            short -= 1
+    return counts
+
+
+class ExamBlueprint:
+    """Per-stratum index arrays and answer masks for one bank version."""
+
+    def __init__(self, qnums: np.ndarray, topics: np.ndarray, multi: np.ndarray, key_masks: np.ndarray):
+        self.qnums = qnums
+        self.topics = topics            # index into TOPIC_NAMES, per bank position
+        self.multi = multi
+        self.key_masks = key_masks
+        # Questions without an answer key can't be graded and are never drawn
+        gradable = key_masks > 0
+        stratum = topics.astype(np.int64) * 2 + multi
+        order = np.flatnonzero(gradable)
+        order = order[np.argsort(stratum[order], kind="stable")]
+        ids, starts = np.unique(stratum[order], return_index=True)
+        self.strata = {int(s): arr for s, arr in zip(ids, np.split(order, starts[1:]))}
+        self.gradable = int(gradable.sum())
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "ExamBlueprint":
+        topic_index = {t: i for i, t in enumerate(TOPIC_NAMES)}
+        topics = np.array([topic_index[topic_of(q)] for q in df["question"]], dtype=np.int8)
+        return cls(
+            qnums=df["qnum"].to_numpy(dtype=np.int32),
+            topics=topics,
+            multi=df["multi"].to_numpy(dtype=bool).astype(np.int8),
+            key_masks=answer_masks(list(df["correct"])),
+        )
+
+    def topic_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.topics[self.key_masks > 0], minlength=len(TOPIC_NAMES))
+        return {t: int(n) for t, n in zip(TOPIC_NAMES, counts) if n}
+
+    def draw(self, size: int = EXAM_SIZE, seed: Optional[int] = None) -> np.ndarray:
+        """Bank positions for one exam, in presentation order."""
+        rng = np.random.default_rng(seed)
+        size = min(size, self.gradable)
+        arrays = list(self.strata.values())
+        counts = allocate(np.array([len(a) for a in arrays]), size)
+        picked = [rng.choice(a, n, replace=False) for a, n in zip(arrays, counts) if n]
+        exam = np.concatenate(picked) if picked else np.zeros(0, dtype=np.int64)
+        rng.shuffle(exam)
+        return exam
+
+    def grade(self, exam: np.ndarray, selections: List[List[str]]) -> Dict:
+        """Grade a whole exam in one pass. selections[i] answers exam[i]."""
+        chosen = answer_masks(selections)
+        ok = chosen == self.key_masks[exam]
+        topics = self.topics[exam]
+        asked = np.bincount(topics, minlength=len(TOPIC_NAMES))
+        right = np.bincount(topics, weights=ok, minlength=len(TOPIC_NAMES)).astype(np.int64)
+        multi = self.multi[exam].astype(bool)
+        score = float(ok.mean()) if len(ok) else 0.0
+        return {
+            "total": int(len(exam)),
+            "correct": int(ok.sum()),
+            "score": round(score, 4),
+            "passed": score >= PASS_MARK,
+            "unanswered": int((chosen == 0).sum()),
+            "single": [int(ok[~multi].sum()), int((~multi).sum())],
+            "multi": [int(ok[multi].sum()), int(multi.sum())],
+            "by_topic": {t: [int(right[i]), int(asked[i])] for i, t in enumerate(TOPIC_NAMES) if asked[i]},
+            "ok": ok,
+        }
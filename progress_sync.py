@@ -0,0 +1,229 @@
+"""
+Carry learner progress between machines: a compact export file, and an
+import that merges it into the progress already there.
+
+An export holds, per learner, the Leitner state of every bank (the
+learner_store.py encoding, with each question's last-check time) and the
+learner's attempt log records. Attempts are stored column by column
+(time since the previous attempt, bank index, qnum, picked letters +
+correct bit) and the whole file is zlib-compressed, so a long history
+shrinks to a few bytes per attempt.
+
+Importing merges rather than overwrites:
+
+    - Leitner state: per question, whichever side was checked last wins
+      (learner_history.History.merge, one vectorized pass per bank)
+    - attempts: each day's log file is read once and only attempts it does
+      not already contain are appended
+
+so importing the same file twice, or syncing two devices back and forth,
+never duplicates anything. The script works on the files directly; a
+running app keeps its in-memory copy of learners who are mid-session, so
+import from the command line while they are idle (or use the app's own
+Sync progress panel).
+
+File layout: MAGIC, then one zlib stream with, per learner, a u16 id
+length and UTF-8 id; a u32 byte count and the encoded state; a u16 bank
+count and each bank id (u16 length + UTF-8); a u32 attempt count n and
+the columns dt int64[n] (milliseconds since the previous attempt, the
+first since the epoch), bank uint16[n], qnum uint32[n], bits uint8[n].
+All integers little-endian.
+
+Usage:
+    python progress_sync.py export alice -o alice.spx
+    python progress_sync.py export --all -o server.spx           # every learner, for server moves
+    python progress_sync.py import alice.spx
+    python progress_sync.py import server.spx --state /srv/learner_state --logs /srv/attempt_logs
+"""
+
+import re
+import sys
+import json
+import zlib
+import struct
+import argparse
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from attempt_log import AttemptLog
+from learner_history import OK_BIT, SELECTED_BITS, History, letters_mask, mask_letters
+from learner_store import LearnerStore, decode_state, encode_state
+
+ROOT = Path(__file__).parent
+LEARNER_STATE_DIR = ROOT / "learner_state"
+ATTEMPT_LOG_DIR = ROOT / "attempt_logs"
+MAGIC = b"SPPX1\n"
+ATTEMPT_COLUMNS = [("dt", "<i8"), ("bank", "<u2"), ("qnum", "<u4"), ("bits", "u1")]
+
+# Pulls the learner id out of a log line without parsing the whole record
+_LEARNER_RE = re.compile(r'"learner":("(?:[^"\\]|\\.)*")')
+
+
+def read_attempts(logs: Path, learners: Optional[Set[str]] = None) -> Dict[str, List[dict]]:
+    """learner -> attempt records (oldest first) from every attempts log; all learners if learners is None."""
+    found = {}
+    for path in sorted(Path(logs).glob("attempts-*.ndjson")):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                m = _LEARNER_RE.search(line)
+                if m is None or (learners is not None and json.loads(m.group(1)) not in learners):
+                    continue
+                rec = json.loads(line)
+                found.setdefault(rec["learner"], []).append(rec)
+    for records in found.values():
+        records.sort(key=lambda r: r["ts"])
+    return found
+
+
+def _pack_str(s: str) -> bytes:
+    b = s.encode("utf-8")
+    return struct.pack("<H", len(b)) + b
+
+
+def _unpack_str(data: bytes, pos: int) -> Tuple[str, int]:
+    (n,) = struct.unpack_from("<H", data, pos)
+    return data[pos + 2:pos + 2 + n].decode("utf-8"), pos + 2 + n
+
+
+def pack_learner(learner: str, state: Dict[str, History], records: List[dict]) -> bytes:
+    banks = sorted({r["bank"] for r in records})
+    bank_index = {b: i for i, b in enumerate(banks)}
+    cols = np.zeros(len(records), dtype=ATTEMPT_COLUMNS)
+    # Log timestamps have millisecond resolution (attempt_log.attempt_record)
+    ms = np.round(np.array([r["ts"] for r in records], dtype=np.float64) * 1000).astype(np.int64)
+    cols["dt"] = np.diff(ms, prepend=0)
+    cols["bank"] = [bank_index[r["bank"]] for r in records]
+    cols["qnum"] = [r["qnum"] for r in records]
+    cols["bits"] = [letters_mask(r.get("selected", "")) | (OK_BIT if r["ok"] else 0) for r in records]
+    state_b = encode_state(state)
+    parts = [_pack_str(learner), struct.pack("<I", len(state_b)), state_b, struct.pack("<H", len(banks))]
+    parts += [_pack_str(b) for b in banks]
+    parts.append(struct.pack("<I", len(records)))
+    parts += [np.ascontiguousarray(cols[name]).tobytes() for name, _ in ATTEMPT_COLUMNS]
+    return b"".join(parts)
+
+
+def export_progress(learners: Iterable[Tuple[str, Dict[str, History], List[dict]]], level: int = 6) -> bytes:
+    """Export file for (learner id, state, attempt records) triples."""
+    body = b"".join(pack_learner(lid, state, records) for lid, state, records in learners)
+    return MAGIC + zlib.compress(body, level)
+
+
+def read_progress(data: bytes) -> Iterator[Tuple[str, Dict[str, History], List[dict]]]:
+    """(learner id, state, attempt records) for every learner in an export file."""
+    if not data.startswith(MAGIC):
+        raise ValueError("not a progress export file")
+    try:
+        body = zlib.decompress(data[len(MAGIC):])
+    except zlib.error as e:
+        raise ValueError(f"damaged progress export file: {e}")
+    pos = 0
+    while pos < len(body):
+        try:
+            learner, state, records, pos = _unpack_learner(body, pos)
+        except (struct.error, ValueError, IndexError, UnicodeDecodeError) as e:
+            raise ValueError(f"damaged progress export file: {e}")
+        yield learner, state, records
+
+
+def _unpack_learner(body: bytes, pos: int) -> Tuple[str, Dict[str, History], List[dict], int]:
+    learner, pos = _unpack_str(body, pos)
+    (size,) = struct.unpack_from("<I", body, pos)
+    state = decode_state(body[pos + 4:pos + 4 + size])
+    pos += 4 + size
+    (nbanks,) = struct.unpack_from("<H", body, pos)
+    pos += 2
+    banks = []
+    for _ in range(nbanks):
+        bank, pos = _unpack_str(body, pos)
+        banks.append(bank)
+    (n,) = struct.unpack_from("<I", body, pos)
+    pos += 4
+    cols = {}
+    for name, dtype in ATTEMPT_COLUMNS:
+        cols[name] = np.frombuffer(body, dtype=dtype, count=n, offset=pos)
+        pos += cols[name].nbytes
+    ts = np.cumsum(cols["dt"]) / 1000
+    selected = {m: "".join(mask_letters(m)) for m in range(SELECTED_BITS + 1)}
+    records = [{"ts": float(t), "learner": learner, "bank": banks[b], "qnum": int(q),
+                "selected": selected[bits & SELECTED_BITS], "ok": bool(bits & OK_BIT)}
+               for t, b, q, bits in zip(ts, cols["bank"], cols["qnum"], cols["bits"])]
+    return learner, state, records, pos
+
+
+def merge_state(current: Dict[str, History], incoming: Dict[str, History]) -> int:
+    """Fold incoming banks into current in place; returns how many questions changed."""
+    return sum(current.setdefault(bank, History()).merge(hist) for bank, hist in incoming.items())
+
+
+def merge_attempts(log: AttemptLog, records: List[dict]) -> int:
+    """Append the records the log doesn't already have; returns how many were appended."""
+    by_path = {}
+    for r in records:
+        by_path.setdefault(log.path_for(r["ts"]), []).append(r)
+    missing = []
+    for path, recs in by_path.items():
+        learners = {r["learner"] for r in recs}
+        seen = set()
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    m = _LEARNER_RE.search(line)
+                    if m is None or json.loads(m.group(1)) not in learners:
+                        continue
+                    rec = json.loads(line)
+                    seen.add((rec["learner"], rec["bank"], rec["qnum"], rec["ts"]))
+        missing += [r for r in recs if (r["learner"], r["bank"], r["qnum"], r["ts"]) not in seen]
+    log.extend(missing)
+    return len(missing)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import learner progress.")
+    parser.add_argument("--state", type=Path, default=LEARNER_STATE_DIR, help="learner state directory")
+    parser.add_argument("--logs", type=Path, default=ATTEMPT_LOG_DIR, help="attempt log directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+    exp = sub.add_parser("export", help="write an export file")
+    exp.add_argument("learners", nargs="*", help="learner ids")
+    exp.add_argument("--all", action="store_true", help="every learner with stored state")
+    exp.add_argument("-o", "--out", type=Path, required=True)
+    imp = sub.add_parser("import", help="merge an export file into this machine's progress")
+    imp.add_argument("file", type=Path)
+    args = parser.parse_args()
+
+    store = LearnerStore(args.state)
+    if args.command == "export":
+        if args.all:
+            states = dict(store.iter_stored())
+            attempts = read_attempts(args.logs)
+        elif args.learners:
+            states = {lid: store.get(lid) for lid in args.learners}
+            attempts = read_attempts(args.logs, set(args.learners))
+        else:
+            print("Error: name learners to export, or pass --all")
+            sys.exit(1)
+        data = export_progress((lid, state, attempts.get(lid, [])) for lid, state in states.items())
+        args.out.write_bytes(data)
+        n = sum(len(attempts.get(lid, [])) for lid in states)
+        print(f"✅ Exported {len(states)} learners, {n} attempts -> {args.out} ({len(data) / 1024:.1f} KB)")
+        return
+
+    if not args.file.exists():
+        print(f"Error: {args.file} not found!")
+        sys.exit(1)
+    log = AttemptLog(args.logs)
+    learners = questions = appended = 0
+    for lid, incoming, records in read_progress(args.file.read_bytes()):
+        state = store.get(lid)
+        questions += merge_state(state, incoming)
+        store.mark_dirty(lid, state)
+        appended += merge_attempts(log, records)
+        learners += 1
+    store.flush()
+    print(f"✅ Merged {learners} learners: {questions} questions updated, {appended} attempts added")
+
+
+if __name__ == "__main__":
+    main()
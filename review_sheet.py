@@ -0,0 +1,260 @@
+"""
+Review sheets: PDFs of the questions a learner last got wrong.
+
+The app builds one sheet on demand (make_review_pdf). Run as a script,
+this module builds a fresh sheet for every learner in learner_state/:
+
+    - every learner's incorrect set is read per bank, and identical sets
+      (common early on, when many learners miss the same questions) are
+      rendered once
+    - unique sets are rendered in a process pool; each worker loads the
+      banks once, caches every question's wrapped lines, and writes
+      binary (not ASCII85) page streams, so a sheet is mostly drawString
+      calls
+    - sheets are written to review_sheets/<learner>/<bank>.pdf (the
+      learner directory is named like its learner_state/ file), and a
+      throughput summary is printed
+    - any other sheet under the output directory is removed: banks a
+      learner has no misses in any more, learners whose state was reset,
+      and banks no longer in banks.json
+
+Requires reportlab: pip install reportlab
+
+Usage:
+    python review_sheet.py                        # learner_state/ -> review_sheets/
+    python review_sheet.py --workers 8 --out /srv/sheets
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from io import BytesIO
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Tuple
+
+import pandas as pd
+
+from bank_registry import BankRegistry
+from learner_store import LearnerStore, id_to_name
+from study_core import OPTION_LABELS, bank_version, load_bank
+
+# Optional PDF generation for review sheet
+try:
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.units import inch
+    from reportlab import rl_config
+    REPORTLAB_AVAILABLE = True
+except Exception:
+    REPORTLAB_AVAILABLE = False
+
+ROOT = Path(__file__).parent
+BANKS_CONFIG = ROOT / "banks.json"
+LEARNER_STATE_DIR = ROOT / "learner_state"
+DEFAULT_OUT = ROOT / "review_sheets"
+TITLE = "SnowPro Core — Review Sheet"
+WRAP_AT = 95
+LEADING = 14
+
+
+def wrap(txt: str, width: int = WRAP_AT) -> List[str]:
+    """Wrap manually at ~width chars, breaking on spaces where possible."""
+    lines = []
+    while len(txt) > 0:
+        if len(txt) <= width:
+            lines.append(txt)
+            break
+        cut = txt.rfind(" ", 0, width)
+        if cut <= 0:
+            cut = width
+        lines.append(txt[:cut])
+        txt = txt[cut:].lstrip()
+    return lines
+
+
+def question_lines(r) -> List[str]:
+    """Wrapped lines for one question: text, options, answer."""
+    lines = wrap(f"Q{int(r.qnum)}: {r.question}")
+    for lab in OPTION_LABELS:
+        opt = getattr(r, lab, None)
+        if isinstance(opt, str) and opt.strip():
+            lines += wrap(f"  {lab}. {opt}")
+    lines += wrap(f"Answer: {','.join(r.correct)}")
+    return lines
+
+
+def render_pdf(blocks: Iterable[List[str]], title: str = TITLE) -> bytes:
+    """Draw pre-wrapped question blocks onto letter pages."""
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    width, height = letter
+    margin = 0.75 * inch
+    x = margin
+    y = height - margin
+
+    def draw(lines):
+        nonlocal y
+        for ln in lines:
+            c.drawString(x, y, ln)
+            y -= LEADING
+            if y < margin:
+                c.showPage()
+                y = height - margin
+
+    c.setFont("Helvetica", 12)
+    draw(wrap(title))
+    y -= 10
+    for lines in blocks:
+        y -= 6
+        draw(lines)
+        y -= 6
+        if y < margin:
+            c.showPage()
+            y = height - margin
+    c.save()
+    return buffer.getvalue()
+
+
+def make_review_pdf(rows: pd.DataFrame) -> bytes:
+    """Create a simple PDF containing missed questions and answers. Requires reportlab."""
+    return render_pdf(question_lines(r) for r in rows.itertuples(index=False))
+
+
+# ----- nightly batch -----
+
+_worker_banks: Dict[str, pd.DataFrame] = {}
+_worker_lines: Dict[Tuple[str, int], List[str]] = {}
+
+
+def _init_worker(banks_config: Path):
+    """Load every bank once per worker process."""
+    # Page streams are zlib-compressed either way; skipping the ASCII85 layer
+    # on top (pure Python without reportlab's C accelerator) saves ~25% per sheet
+    rl_config.useA85 = 0
+    registry = BankRegistry.from_config(banks_config, loader=load_bank, version_fn=bank_version)
+    for bank_id, bank in registry.banks.items():
+        df = load_bank(bank, bank_version(bank))
+        _worker_banks[bank_id] = df.drop_duplicates("qnum").set_index("qnum", drop=False)
+
+
+def _render_set(key: Tuple[str, Tuple[int, ...]]) -> Tuple[Tuple[str, Tuple[int, ...]], bytes]:
+    bank_id, qnums = key
+    df = _worker_banks[bank_id]
+    blocks = []
+    for qnum in qnums:
+        lines = _worker_lines.get((bank_id, qnum))
+        if lines is None:
+            if qnum not in df.index:
+                continue  # question no longer in the bank
+            lines = _worker_lines[(bank_id, qnum)] = question_lines(df.loc[qnum])
+        blocks.append(lines)
+    return key, render_pdf(blocks)
+
+
+def collect_incorrect_sets(state_dir: Path, banks: Iterable[str]) -> Dict[Tuple[str, Tuple[int, ...]], List[str]]:
+    """(bank, incorrect qnums) -> learners who have exactly that set."""
+    banks = set(banks)
+    sets = {}
+    for learner, state in LearnerStore(state_dir).iter_stored():
+        for bank_id, hist in state.items():
+            if bank_id not in banks:
+                continue
+            wrong = tuple(hist.qnums(ok=False).tolist())
+            if wrong:
+                sets.setdefault((bank_id, wrong), []).append(learner)
+    return sets
+
+
+def write_atomic(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+def build_all(state_dir: Path, out_dir: Path, banks_config: Path = BANKS_CONFIG, workers: int = None) -> Dict:
+    """Render review sheets for every stored learner. Returns throughput figures."""
+    t0 = time.perf_counter()
+    bank_ids = list(BankRegistry.from_config(banks_config, loader=None, version_fn=None).banks)
+    sets = collect_incorrect_sets(state_dir, bank_ids)
+    learners = {name for names in sets.values() for name in names}
+    t_scan = time.perf_counter() - t0
+
+    # Biggest sets first so the pool isn't left waiting on one long sheet
+    keys = sorted(sets, key=lambda k: -len(k[1]))
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(keys) // (workers * 8))
+    sheets = rendered = size = 0
+    written = set()
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(banks_config,)) as pool:
+        for (bank_id, qnums), pdf in pool.map(_render_set, keys, chunksize=chunksize):
+            rendered += 1
+            for learner in sets[(bank_id, qnums)]:
+                path = out_dir / id_to_name(learner) / f"{bank_id}.pdf"
+                write_atomic(path, pdf)
+                written.add(path)
+                sheets += 1
+                size += len(pdf)
+    # Every sheet still current was just rewritten. Anything else is stale
+    # (misses all fixed, learner reset, bank dropped) and would otherwise
+    # keep serving old questions
+    removed = 0
+    for stale in out_dir.glob("*/*.pdf"):
+        if stale not in written:
+            stale.unlink()
+            removed += 1
+    for learner_dir in out_dir.glob("*/"):
+        if not any(learner_dir.iterdir()):
+            learner_dir.rmdir()
+    elapsed = time.perf_counter() - t0
+    return {
+        "learners": len(learners),
+        "sheets": sheets,
+        "removed": removed,
+        "unique_sets": rendered,
+        "scan_seconds": round(t_scan, 2),
+        "seconds": round(elapsed, 2),
+        "sheets_per_second": round(sheets / elapsed, 1) if elapsed else 0.0,
+        "renders_per_second": round(rendered / (elapsed - t_scan), 1) if elapsed > t_scan else 0.0,
+        "megabytes": round(size / 1e6, 1),
+        "workers": workers,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a review sheet for every learner.")
+    parser.add_argument("--state", type=Path, default=LEARNER_STATE_DIR, help="learner state directory")
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT)
+    parser.add_argument("--banks", type=Path, default=BANKS_CONFIG)
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default: CPU count)")
+    args = parser.parse_args()
+
+    if not REPORTLAB_AVAILABLE:
+        print("Error: reportlab is required: pip install reportlab")
+        sys.exit(1)
+    if not args.state.exists():
+        print(f"Error: {args.state} not found!")
+        sys.exit(1)
+
+    report = build_all(args.state, args.out, args.banks, args.workers)
+    saved = report["sheets"] - report["unique_sets"]
+    print(f"Learners with misses: {report['learners']}")
+    print(f"Sheets written:       {report['sheets']} ({report['megabytes']} MB) to {args.out}")
+    print(f"Unique sets rendered: {report['unique_sets']} ({saved} renders saved by dedup)")
+    print(f"Stale sheets removed: {report['removed']}")
+    print(f"Workers:              {report['workers']}")
+    print(f"Time:                 {report['seconds']}s (scan {report['scan_seconds']}s)")
+    print(f"✅ {report['sheets_per_second']} sheets/s, {report['renders_per_second']} renders/s")
+
+
+if __name__ == "__main__":
+    main()
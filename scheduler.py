@@ -0,0 +1,49 @@
+"""
+Leitner box rules for Spaced Repetition mode.
+
+Kept out of snowpro_app.py so the learner simulator (spaced_sim.py) runs
+exactly the rules the app uses. The rules are written against a single
+question's history dict, {"box": int, "last_ok": bool}; for whole banks
+they are evaluated once over every (last_ok, box) state into lookup
+tables (priority_table / box_table).
+"""
+
+from typing import Callable, Dict
+
+import numpy as np
+
+BOX_MIN = 0
+BOX_MAX = 5
+# Row order of priority_table: never answered, last answer wrong, last answer right
+LAST_OK_STATES = [None, False, True]
+
+
+def spaced_priority(history: Dict[str, Dict]) -> int:
+    """Small Leitner-like boxes: 0 (new), 1 (wrong last), 2 (right once), 3+ (mastered). Lower = higher priority."""
+    box = history.get("box", 0)
+    last_ok = history.get("last_ok", None)
+    if last_ok is False:
+        return 0
+    return max(1, 5 - int(box))
+
+
+def update_box(box: int, ok: bool) -> int:
+    """Move up one box on a correct answer, down one on a wrong one."""
+    if ok:
+        return min(box + 1, BOX_MAX)
+    return max(box - 1, BOX_MIN)
+
+
+def priority_table(priority_fn: Callable = spaced_priority) -> np.ndarray:
+    """priority[last_ok state, box] for every state a question can be in."""
+    table = np.zeros((len(LAST_OK_STATES), BOX_MAX - BOX_MIN + 1), dtype=np.float64)
+    for i, last_ok in enumerate(LAST_OK_STATES):
+        for b in range(BOX_MIN, BOX_MAX + 1):
+            hist = {"box": b} if last_ok is None else {"box": b, "last_ok": last_ok}
+            table[i, b] = priority_fn(hist)
+    return table
+
+
+def box_table(box_fn: Callable = update_box) -> np.ndarray:
+    """next_box[box, ok] for every box and outcome."""
+    return np.array([[box_fn(b, False), box_fn(b, True)] for b in range(BOX_MIN, BOX_MAX + 1)], dtype=np.int8)
@@ -1,73 +1,123 @@
 
 import json
+import time
+import uuid
+import atexit
+from collections import deque
 from pathlib import Path
 import random
-from typing import List, Dict, Tuple
+from typing import Dict, Tuple
 import streamlit as st
 import pandas as pd
 
-# Optional PDF generation for review sheet
-try:
-    from reportlab.lib.pagesizes import letter
-    from reportlab.pdfgen import canvas
-    from reportlab.lib.units import inch
-    REPORTLAB_AVAILABLE = True
-except Exception:
-    REPORTLAB_AVAILABLE = False
+from bank_registry import BankRegistry
+from learner_store import LearnerStore
+from attempt_log import AttemptLog, attempt_record, iter_attempts
+from mock_exam import EXAM_MINUTES, EXAM_SIZE, ExamBlueprint
+from learner_history import History, letters_mask
+from study_core import (bank_version, build_cards, build_spaced_order, load_bank,
+                        record_check, to_labels)
+from review_sheet import REPORTLAB_AVAILABLE, make_review_pdf
+from miss_rankings import MissRankings
+from progress_sync import export_progress, merge_attempts, merge_state, read_attempts, read_progress
 
-DATA_PATH = Path(__file__).parent / "snowpro_questions.json"
+# Which banks this deployment serves, plus cache budget (see bank_registry.py)
+BANKS_CONFIG = Path(__file__).parent / "banks.json"
+# One file per registered learner (see learner_store.py)
+LEARNER_STATE_DIR = Path(__file__).parent / "learner_state"
+# Every Check is logged here; item_analytics.py turns the logs into item_stats.json
+ATTEMPT_LOG_DIR = Path(__file__).parent / "attempt_logs"
+ITEM_STATS_PATH = Path(__file__).parent / "item_stats.json"
+# Cohort most-missed rankings, updated from the attempt logs (see miss_rankings.py)
+MISS_RANKINGS_PATH = Path(__file__).parent / "miss_rankings.json"
+COHORT_ROWS = 10
+# Flashcards: a missed card comes back after this many other cards
+REQUEUE_GAP = 3
+
+@st.cache_resource
+def get_registry() -> BankRegistry:
+    """One registry per server process, shared by all sessions."""
+    return BankRegistry.from_config(BANKS_CONFIG, loader=load_bank, version_fn=bank_version)
+
+@st.cache_resource
+def get_learner_store() -> LearnerStore:
+    """Shared learner state; flushed to disk on eviction, periodically and at exit."""
+    store = LearnerStore(LEARNER_STATE_DIR)
+    atexit.register(store.flush)
+    return store
+
+@st.cache_resource
+def get_attempt_log() -> AttemptLog:
+    return AttemptLog(ATTEMPT_LOG_DIR)
+
+@st.cache_resource
+def get_miss_rankings() -> MissRankings:
+    """Shared cohort rankings; picks up where the last saved state left off and is saved at exit."""
+    rankings = MissRankings.load(MISS_RANKINGS_PATH, ATTEMPT_LOG_DIR)
+    atexit.register(rankings.save, MISS_RANKINGS_PATH)
+    return rankings
 
 @st.cache_data
-def load_data() -> pd.DataFrame:
-    with open(DATA_PATH, "r") as f:
-        data = json.load(f)
-    df = pd.DataFrame(data)
-    def norm(x):
-        if x is None:
-            return []
-        if isinstance(x, list):
-            return [str(y).upper() for y in x]
-        if isinstance(x, str):
-            return [c for c in x.upper() if c in "ABCDE"]
-        return []
-    df["correct"] = df["correct"].apply(norm)
-    return df.sort_values("qnum").reset_index(drop=True)
-
-def to_labels(selected: List[str]) -> List[str]:
-    labs = []
-    for s in selected:
-        if isinstance(s, str) and len(s) > 1 and s[1] == ".":
-            labs.append(s[0].upper())
-    return labs
-
-def verdict(selected_labels: List[str], correct_labels: List[str]) -> bool:
-    return sorted(selected_labels) == sorted(correct_labels)
-
-def spaced_priority(history: Dict[str, Dict]) -> int:
-    """Small Leitner-like boxes: 0 (new), 1 (wrong last), 2 (right once), 3+ (mastered). Lower = higher priority."""
-    box = history.get("box", 0)
-    last_ok = history.get("last_ok", None)
-    if last_ok is False:
-        return 0
-    return max(1, 5 - int(box))
-
-def build_spaced_order(df: pd.DataFrame) -> pd.DataFrame:
-    results = st.session_state.get("results", {})
-    # Build a priority value per question
-    priorities = []
-    for q in df.itertuples(index=False):
-        hist = results.get(int(q.qnum), {})
-        prio = spaced_priority(hist)
-        priorities.append((int(q.qnum), prio))
-    priomap = dict(priorities)
-    df2 = df.copy()
-    df2["priority"] = df2["qnum"].map(priomap).fillna(3)
-    return df2.sort_values(["priority","qnum"])
-
-def score_report(df_all: pd.DataFrame):
-    results = st.session_state.get("results", {})
+def load_item_stats(mtime_ns: int) -> Dict[str, Dict]:
+    """Cohort statistics per bank from item_analytics.py (re-read when the file changes)."""
+    with open(ITEM_STATS_PATH, "r", encoding="utf-8") as f:
+        return json.load(f).get("banks", {})
+
+def item_stats_for(bank_id: str) -> Dict[str, Dict]:
+    if not ITEM_STATS_PATH.exists():
+        return {}
+    return load_item_stats(ITEM_STATS_PATH.stat().st_mtime_ns).get(bank_id, {}).get("items", {})
+
+def load_data(bank_id: str) -> pd.DataFrame:
+    """Bank DataFrame, loaded on first use and kept in the registry's LRU."""
+    return get_registry().get(bank_id)
+
+def get_cards(bank_id: str, df: pd.DataFrame) -> Dict[int, Dict]:
+    """Precompiled question cards for the loaded bank df, keyed by bank position.
+    Kept on the registry entry, so they are rebuilt and evicted together with df."""
+    return get_registry().derived(bank_id, df, "cards", build_cards)
+
+def get_blueprint(bank_id: str, df: pd.DataFrame) -> ExamBlueprint:
+    """Mock exam strata for the loaded bank df (kept on the registry entry like get_cards)."""
+    return get_registry().derived(bank_id, df, "blueprint", ExamBlueprint.from_frame)
+
+def session_learner(learner_id: str) -> str:
+    """Learner id for the logs; anonymous sessions get a per-session id."""
+    return learner_id or st.session_state.setdefault("session_uid", f"anon-{uuid.uuid4().hex[:12]}")
+
+def sync_panel(by_bank: Dict, learner_id: str):
+    """Sidebar export/import of this learner's progress, to carry it to another device (progress_sync.py)."""
+    learner = session_learner(learner_id)
+    with st.sidebar.expander("Sync progress"):
+        if st.button("Prepare export"):
+            attempts = read_attempts(ATTEMPT_LOG_DIR, {learner}).get(learner, [])
+            data = export_progress([(learner, by_bank, attempts)])
+            st.download_button("Download progress.spx", data=data, file_name="progress.spx",
+                               mime="application/octet-stream")
+        upload = st.file_uploader("Import progress (.spx)", type=["spx"])
+        imported = st.session_state.setdefault("imported_files", set())
+        if upload is None or upload.file_id in imported:
+            return
+        try:
+            sections = list(read_progress(upload.getvalue()))
+        except ValueError as e:
+            st.error(f"Could not read {upload.name}: {e}")
+            return
+        if len(sections) != 1:
+            st.error(f"{upload.name} holds {len(sections)} learners; import it with progress_sync.py.")
+            return
+        _, incoming, records = sections[0]
+        # Newer check wins per question; attempts already in the logs are skipped
+        questions = merge_state(by_bank, incoming)
+        if learner_id:
+            get_learner_store().mark_dirty(learner_id, by_bank)
+        added = merge_attempts(get_attempt_log(), [dict(r, learner=learner) for r in records])
+        imported.add(upload.file_id)
+        st.success(f"Merged: {questions} questions updated, {added} attempts added.")
+
+def score_report(df_all: pd.DataFrame, results: History, item_stats: Dict[str, Dict] = None):
     attempted = len(results)
-    correct = sum(1 for r in results.values() if r.get("correct"))
+    correct = results.correct_count()
     acc = (correct / attempted * 100) if attempted else 0.0
 
     st.subheader("Score Report")
@@ -79,105 +129,268 @@ def score_report(df_all: pd.DataFrame):
     if attempted:
         # Most missed
         wrong_rows = []
-        for q in df_all.itertuples(index=False):
+        missed = df_all[df_all["qnum"].isin(results.qnums(ok=False))]
+        for q in missed.itertuples(index=False):
             qn = int(q.qnum)
             r  = results.get(qn)
-            if r and not r.get("correct"):
-                wrong_rows.append({
+            if r:
+                row = {
                     "qnum": qn,
                     "question": q.question,
-                    "answer": ",".join(r.get("answer", [])),
-                    "your": ",".join(r.get("selected", [])),
-                })
+                    "answer": ",".join(q.correct),
+                    "your": ",".join(r["selected"]),
+                }
+                if item_stats:
+                    # How the whole cohort did on the same question
+                    s = item_stats.get(str(qn), {})
+                    row["cohort correct"] = f"{s['p'] * 100:.0f}%" if s else ""
+                    row["flags"] = ", ".join(s.get("flags", []))
+                wrong_rows.append(row)
         if wrong_rows:
             st.markdown("#### Most Recent Incorrect")
             st.dataframe(pd.DataFrame(wrong_rows).sort_values("qnum"))
+            if item_stats:
+                st.caption("Cohort figures come from item_stats.json (item_analytics.py).")
 
-def make_review_pdf(rows: pd.DataFrame) -> bytes:
-    """Create a simple PDF containing missed questions and answers. Requires reportlab."""
-    from io import BytesIO
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=letter)
-    width, height = letter
-    margin = 0.75 * inch
-    x = margin
-    y = height - margin
-    def write_line(txt, leading=14):
-        nonlocal y
-        lines = []
-        # wrap manually at ~95 chars
-        while len(txt) > 0:
-            if len(txt) <= 95:
-                lines.append(txt)
-                break
-            cut = txt.rfind(" ", 0, 95)
-            if cut <= 0:
-                cut = 95
-            lines.append(txt[:cut])
-            txt = txt[cut:].lstrip()
-        for ln in lines:
-            c.drawString(x, y, ln)
-            y -= leading
-            if y < margin:
-                c.showPage()
-                y = height - margin
-    c.setFont("Helvetica", 12)
-    write_line("SnowPro Core — Review Sheet")
-    y -= 10
-    for r in rows.itertuples(index=False):
-        y -= 6
-        write_line(f"Q{int(r.qnum)}: {r.question}")
-        for lab in ["A","B","C","D","E"]:
-            opt = getattr(r, lab)
-            if isinstance(opt, str) and opt.strip():
-                write_line(f"  {lab}. {opt}")
-        write_line(f"Answer: {','.join(r.correct)}")
-        y -= 6
-        if y < margin:
-            c.showPage()
-            y = height - margin
-    c.save()
-    buffer.seek(0)
-    return buffer.read()
-
-def display_question(row: pd.Series, idx: int, mode: str):
-    st.subheader(f"Q{int(row.qnum)}")
-    st.write(row.question)
-    options = []
-    labels = ["A","B","C","D","E"]
-    for lab in labels:
-        txt = str(row.get(lab, "") or "").strip()
-        if txt:
-            options.append(f"{lab}. {txt}")
-    key = f"sel_{int(row.qnum)}_{idx}_{mode}"
-    multiselect = len(row["correct"]) > 1
-    if multiselect:
-        chosen = st.multiselect("Select all that apply:", options, key=key)
+def cohort_view(df_all: pd.DataFrame, bank_id: str):
+    """Most missed questions and most picked wrong answers across all learners."""
+    rankings = get_miss_rankings()
+    rankings.refresh()   # only reads attempts logged since the last refresh
+    missed = rankings.most_missed(bank_id, COHORT_ROWS)
+    if not missed:
+        return
+    by_qnum = df_all.drop_duplicates("qnum").set_index("qnum")
+    def question(qn):
+        return by_qnum.at[qn, "question"] if qn in by_qnum.index else ""
+    def answer(qn):
+        return ",".join(by_qnum.at[qn, "correct"]) if qn in by_qnum.index else ""
+
+    st.markdown("#### Cohort: Most Missed")
+    st.dataframe(pd.DataFrame([{
+        "qnum": r["qnum"],
+        "question": question(r["qnum"]),
+        "answer": answer(r["qnum"]),
+        "misses": r["misses"],
+        "miss rate": f"{r['miss_rate'] * 100:.0f}%",
+    } for r in missed]))
+    wrong = rankings.top_wrong_answers(bank_id, COHORT_ROWS)
+    if wrong:
+        st.markdown("#### Cohort: Most Picked Wrong Answers")
+        st.dataframe(pd.DataFrame([{
+            "qnum": r["qnum"],
+            "question": question(r["qnum"]),
+            "picked": ",".join(r["selected"]),
+            "answer": answer(r["qnum"]),
+            "times": r["times"],
+            "share of checks": f"{r['share'] * 100:.0f}%",
+        } for r in wrong]))
+    if any(r["error"] for r in missed + wrong):
+        st.caption("Counts are approximate for this bank (more distinct keys than miss_rankings.py tracks).")
+
+def display_question(card: Dict, idx: int, mode: str):
+    st.subheader(card["title"])
+    st.write(card["question"])
+    key = f"sel_{card['qnum']}_{idx}_{mode}"
+    if card["multi"]:
+        chosen = st.multiselect("Select all that apply:", card["options"], key=key)
     else:
-        chosen = st.radio("Choose one:", options, key=key, index=None)
+        chosen = st.radio("Choose one:", card["options"], key=key, index=None)
         chosen = [chosen] if chosen else []
     return chosen
 
+def new_deck(df: pd.DataFrame, order: str, config: Tuple) -> Dict:
+    positions = df["qnum"].sort_values().index.to_numpy()
+    if order == "Random":
+        positions = random.Random(st.session_state.get("seed", 42)).sample(list(positions), len(positions))
+    return {"config": config, "queue": deque(int(p) for p in positions),
+            "current": None, "seq": 0, "checked": None}
+
+def advance_deck(deck: Dict):
+    """Move to the next card; a missed card goes back into the queue."""
+    done, checked = deck["current"], deck["checked"]
+    if done is not None and checked is not None and not checked["ok"]:
+        deck["queue"].insert(min(REQUEUE_GAP, len(deck["queue"])), done)
+    deck["current"] = deck["queue"].popleft() if deck["queue"] else None
+    deck["checked"] = None
+    deck["seq"] += 1
+
+def flashcards(cards: Dict[int, Dict], df: pd.DataFrame, results: History, order: str,
+               bank_id: str, learner_id: str, by_bank: Dict):
+    """One card per screen; the deck holds bank positions, cards come precompiled from get_cards."""
+    config = (bank_id, hash(df.index.to_numpy().tobytes()), order)
+    deck = st.session_state.get("deck")
+    if deck is None or deck["config"] != config:
+        deck = st.session_state["deck"] = new_deck(df, order, config)
+        advance_deck(deck)
+
+    st.caption(f"{len(deck['queue'])} cards left in this deck")
+    if deck["current"] is None:
+        st.success("🎉 Deck finished.")
+        st.button("Start over", on_click=st.session_state.pop, args=("deck", None))
+        return
+
+    card = cards[deck["current"]]
+    st.subheader(card["title"])
+    st.write(card["question"])
+    key = f"card_{bank_id}_{deck['seq']}"
+    if card["multi"]:
+        chosen = st.multiselect("Select all that apply:", card["options"], key=key)
+    else:
+        chosen = st.radio("Choose one:", card["options"], key=key, index=None)
+        chosen = [chosen] if chosen else []
+
+    if deck["checked"] is None and st.button("Check", key=f"{key}_check"):
+        selected_labs = to_labels(chosen)
+        ok = record_check(results, card["qnum"], selected_labs, card["correct"])
+        if learner_id:
+            get_learner_store().mark_dirty(learner_id, by_bank)
+        get_attempt_log().append(session_learner(learner_id), bank_id, card["qnum"], selected_labs, ok)
+        deck["checked"] = {"ok": ok, "selected": ", ".join(selected_labs) or "—"}
+
+    checked = deck["checked"]
+    if checked is not None:
+        if checked["ok"]:
+            st.success(card["correct_msg"])
+        else:
+            st.error(f"❌ Incorrect. Your pick: {checked['selected']} | {card['answer_msg']}")
+    st.button("Next card ➡️", key=f"{key}_next", on_click=advance_deck, args=(deck,))
+
+def exam_history(bank_id: str, learner: str) -> pd.DataFrame:
+    rows = [e for e in iter_attempts(ATTEMPT_LOG_DIR, "exams") if e["learner"] == learner and e["bank"] == bank_id]
+    if not rows:
+        return pd.DataFrame()
+    hist = pd.DataFrame(rows)
+    hist["taken"] = pd.to_datetime(hist["ts"], unit="s")
+    hist["score %"] = hist["score"] * 100
+    return hist.set_index("taken")
+
+def start_exam(bp: ExamBlueprint, bank_id: str, size: int, minutes: int):
+    st.session_state["exam"] = {
+        "bank": bank_id,
+        "id": uuid.uuid4().hex[:8],
+        "positions": bp.draw(size),
+        "started": time.time(),
+        "minutes": minutes,
+        "result": None,
+    }
+
+def mock_exam(df_all: pd.DataFrame, cards: Dict[int, Dict], bank_id: str, learner: str):
+    """Timed, stratified exam; answered in one form and graded in one batch on submit."""
+    bp = get_blueprint(bank_id, df_all)
+    exam = st.session_state.get("exam")
+    if exam and exam["bank"] != bank_id:
+        exam = None
+
+    if exam is None:
+        st.subheader("Mock Exam")
+        st.write("Questions are drawn in proportion to each topic and to the single/multi-answer mix of the bank.")
+        size = st.number_input("Questions", min_value=1, max_value=bp.gradable, value=min(EXAM_SIZE, bp.gradable))
+        minutes = st.number_input("Time limit (minutes)", min_value=1, value=EXAM_MINUTES)
+        st.button("Start exam", on_click=start_exam, args=(bp, bank_id, int(size), int(minutes)))
+        hist = exam_history(bank_id, learner)
+        if len(hist):
+            st.markdown("#### Past exams")
+            st.line_chart(hist["score %"])
+        return
+
+    positions = exam["positions"]
+    elapsed = time.time() - exam["started"]
+    limit = exam["minutes"] * 60
+
+    if exam["result"] is None:
+        left = limit - elapsed
+        if left > 0:
+            st.info(f"⏱️ {int(left // 60)} min left of {exam['minutes']} (deadline {time.strftime('%H:%M', time.localtime(exam['started'] + limit))}).")
+        else:
+            st.warning("⏱️ Time is up. Submit to see your score; the exam is recorded as over time.")
+        with st.form(f"exam_{exam['id']}"):
+            chosen = []
+            for i, pos in enumerate(positions):
+                chosen.append(display_question(cards[df_all.index[pos]], i, f"exam_{exam['id']}"))
+                st.markdown('---')
+            submitted = st.form_submit_button("Submit exam")
+        if not submitted:
+            return
+        selections = [to_labels(c) for c in chosen]
+        result = bp.grade(positions, selections)
+        ok = result.pop("ok")
+        result.update(seconds=round(elapsed), timed_out=elapsed > limit,
+                      qnums=[int(q) for q in bp.qnums[positions]])
+        get_attempt_log().append_exam(learner, bank_id, result)
+        # Skipped questions count against the exam score but are not attempts;
+        # logging them as misses would skew item stats and cohort rankings
+        get_attempt_log().extend([attempt_record(learner, bank_id, qnum, sel, good)
+                                  for qnum, sel, good in zip(result["qnums"], selections, ok) if sel])
+        exam["result"], exam["selections"], exam["ok"] = result, selections, ok
+
+    result = exam["result"]
+    st.subheader("Mock Exam Result")
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Score", f"{result['score'] * 100:.1f}%", "pass" if result["passed"] else "fail")
+    c2.metric("Correct", f"{result['correct']} / {result['total']}")
+    c3.metric("Time", f"{result['seconds'] // 60} min", "over time" if result["timed_out"] else None)
+    by_topic = pd.DataFrame(
+        [{"topic": t, "correct": r, "asked": n, "%": round(r / n * 100, 1)} for t, (r, n) in result["by_topic"].items()]
+    )
+    st.dataframe(by_topic.sort_values("%"))
+
+    wrong = [i for i, good in enumerate(exam["ok"]) if not good]
+    if wrong:
+        st.markdown("#### Missed")
+        rows = df_all.iloc[positions[wrong]]
+        st.dataframe(pd.DataFrame({
+            "qnum": rows["qnum"].to_numpy(),
+            "question": rows["question"].to_numpy(),
+            "answer": [",".join(c) for c in rows["correct"]],
+            "your": [",".join(exam["selections"][i]) for i in wrong],
+        }))
+
+    hist = exam_history(bank_id, learner)
+    if len(hist) > 1:
+        st.markdown("#### Trend")
+        st.line_chart(hist["score %"])
+    st.button("New exam", on_click=st.session_state.pop, args=("exam", None))
+
 def main():
     st.set_page_config(page_title="SnowPro Core Study Helper", layout="wide")
     st.title("❄️ SnowPro Core Study Helper")
     st.caption("Full bank with Score Report, Spaced Repetition, and Review Sheet export.")
 
-    df_all = load_data()
+    titles = get_registry().titles()
+    bank_id = next(iter(titles))
+    if len(titles) > 1:
+        bank_id = st.sidebar.selectbox("Exam", list(titles), format_func=titles.get)
+    df_all = load_data(bank_id)
     total = len(df_all)
+    cards = get_cards(bank_id, df_all)
 
-    mode = st.sidebar.radio("Mode", ["Practice", "Spaced Repetition", "Score Report"], index=0)
+    mode = st.sidebar.radio("Mode", ["Practice", "Spaced Repetition", "Flashcards", "Mock Exam", "Score Report"], index=0)
+    # Widget keys are per bank so selections never leak between exams
+    key_scope = f"{bank_id}_{mode}"
 
-    if "results" not in st.session_state:
-        st.session_state["results"] = {}  # qnum -> {"correct": bool, "selected": List[str], "answer": List[str], "box": int, "last_ok": bool}
+    # Registered learners keep history in the shared store (bounded hot set,
+    # rest on disk); anonymous sessions keep it in session_state as before.
+    # qnums are only unique within a bank, so history is kept per bank.
+    learner_id = st.sidebar.text_input("Learner ID (optional)", key="learner_id").strip()
+    if learner_id:
+        store = get_learner_store()
+        try:
+            by_bank = store.get(learner_id)
+        except ValueError as e:
+            st.sidebar.error(f"{e}; progress is kept for this session only.")
+            learner_id = ""
+    if not learner_id:
+        by_bank = st.session_state.setdefault("results_by_bank", {})
 
-    results = st.session_state["results"]
+    sync_panel(by_bank, learner_id)
+    results = by_bank.setdefault(bank_id, History())  # per-qnum box, last result and last pick
 
     if mode == "Score Report":
-        score_report(df_all)
+        score_report(df_all, results, item_stats_for(bank_id))
+        cohort_view(df_all, bank_id)
         st.markdown("---")
         # Export missed questions
-        wrong = df_all[df_all["qnum"].isin([q for q,v in results.items() if not v.get("correct", False)])]
+        wrong = df_all[df_all["qnum"].isin(results.qnums(ok=False))]
         if len(wrong):
             st.subheader("Export Review Sheet")
             if REPORTLAB_AVAILABLE:
@@ -188,8 +401,12 @@ def main():
                 st.info("To export as PDF, please install ReportLab: `pip install reportlab` and restart the app.")
         return
 
+    if mode == "Mock Exam":
+        mock_exam(df_all, cards, bank_id, session_learner(learner_id))
+        return
+
     # Shared filters
-    multi_mask = df_all["correct"].apply(lambda xs: len(xs) > 1)
+    multi_mask = df_all["multi"]
     filter_mode = st.sidebar.radio("Question type", ["All", "Single-answer only", "Multi-answer only"], index=0)
     df = df_all.copy()
     if filter_mode == "Single-answer only":
@@ -203,8 +420,12 @@ def main():
     df = df[(df["qnum"] >= rmin) & (df["qnum"] <= rmax)]
     order = st.sidebar.radio("Order", ["Ascending", "Random"], index=0)
 
+    if mode == "Flashcards":
+        flashcards(cards, df, results, order, bank_id, learner_id, by_bank)
+        return
+
     if mode == "Spaced Repetition":
-        df = build_spaced_order(df)
+        df = build_spaced_order(df, results)
     else:
         if order == "Random":
             df = df.sample(frac=1, random_state=st.session_state.get("seed", 42))
@@ -213,7 +434,7 @@ def main():
 
     # Progress header
     attempted = len(results)
-    correct_count = sum(1 for v in results.values() if v.get("correct", False))
+    correct_count = results.correct_count()
     col1, col2, col3 = st.columns(3)
     col1.metric("Questions in view", len(df))
     col2.metric("Attempted (all-time)", attempted)
@@ -222,49 +443,45 @@ def main():
     show_answers = st.sidebar.checkbox("Show answers immediately", value=True)
     review_only   = st.sidebar.checkbox("Review incorrect only", value=False)
     if review_only:
-        bad_ids = [q for q, res in results.items() if not res.get("correct", False)]
-        df = df[df["qnum"].isin(bad_ids)]
+        df = df[df["qnum"].isin(results.qnums(ok=False))]
 
-    # Render loop
-    for idx, row in df.reset_index(drop=True).iterrows():
-        selected = display_question(row, idx, mode)
+    # Render loop: cards are precompiled per bank version (get_cards), so
+    # each question is dictionary lookups plus widget calls
+    for idx, pos in enumerate(df.index):
+        card = cards[pos]
+        qnum = card["qnum"]
+        selected = display_question(card, idx, key_scope)
         selected_labs = to_labels(selected)
-        btn = st.button(f"Check Q{int(row.qnum)}", key=f"btn_{int(row.qnum)}_{mode}")
+        btn = st.button(card["check_label"], key=f"btn_{qnum}_{key_scope}")
         if btn:
-            ok = verdict(selected_labs, row["correct"])
-            hist = results.get(int(row.qnum), {"box":0})
-            # Update Leitner box
-            if ok:
-                hist["box"] = min(hist.get("box", 0) + 1, 5)
-            else:
-                hist["box"] = max(hist.get("box", 0) - 1, 0)
-            hist["last_ok"] = ok
-            hist["correct"] = ok
-            hist["selected"] = selected_labs
-            hist["answer"] = row["correct"]
-            results[int(row.qnum)] = hist
+            ok = record_check(results, qnum, selected_labs, card["correct"])
+            if learner_id:
+                store.mark_dirty(learner_id, by_bank)
+            get_attempt_log().append(session_learner(learner_id), bank_id, qnum, selected_labs, ok)
 
         # Feedback
-        if show_answers or int(row.qnum) in results:
-            res = results.get(int(row.qnum))
+        if show_answers or qnum in results:
+            res = results.get(qnum)
             if res:
                 ok = res["correct"]
                 if ok:
-                    st.success(f"✅ Correct. Answer: {', '.join(res['answer'])}")
+                    st.success(card["correct_msg"])
                 else:
-                    st.error(f"❌ Incorrect. Your pick: {', '.join(res['selected']) or '—'} | Answer: {', '.join(res['answer'])}")
+                    st.error(f"❌ Incorrect. Your pick: {', '.join(res['selected']) or '—'} | {card['answer_msg']}")
             else:
-                ok = verdict(selected_labs, row['correct'])
+                ok = letters_mask(selected_labs) == card["mask"]
                 if selected_labs:
                     if ok:
-                        st.success(f"✅ Correct. Answer: {', '.join(row['correct'])}")
+                        st.success(card["correct_msg"])
                     else:
-                        st.info(f"Answer: {', '.join(row['correct'])}")
+                        st.info(card["answer_msg"])
             st.markdown('---')
 
     st.sidebar.markdown("---")
     if st.sidebar.button("Reset history (local)"):
-        st.session_state["results"] = {}
+        by_bank[bank_id] = History()
+        if learner_id:
+            store.mark_dirty(learner_id, by_bank)
         st.experimental_rerun()
 
     st.markdown("---")
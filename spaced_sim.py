@@ -0,0 +1,229 @@
+"""
+Simulate learners studying the bank to compare spaced-repetition policies.
+
+Thousands of synthetic learners answer one question per step, each step
+picking the question their policy ranks first. All learners advance
+together as NumPy arrays of shape (learners, questions), so a policy run
+is a few vectorized operations per step.
+
+Memory model (per learner and question):
+    - before a question has been studied it is answered by guessing
+      (1 / options, or 1 / combinations for multi-answer questions),
+      unless the learner already knew it (--prior)
+    - once studied, recall decays as exp(-elapsed / strength); a miss is
+      still right by guessing with the guess probability
+    - every answer reveals the key: a correct answer multiplies strength
+      by --growth (scaled by the learner's ability), a miss halves it
+A learner has mastered the bank when their mean recall across all
+questions reaches --target. Policies are ranked by the median number of
+questions answered to mastery (fewer is better; learners who do not get
+there within --steps count as never).
+
+A policy is a priority function of a question's history dict (lower is
+shown first) plus a box update rule, the same signatures as
+scheduler.spaced_priority / scheduler.update_box. They are tabulated over
+every (last_ok, box) state, so any rule that fits those signatures can be
+simulated, and a winner can be dropped into scheduler.py unchanged.
+
+Usage:
+    python spaced_sim.py                               # all policies, 2000 learners
+    python spaced_sim.py --learners 5000 --steps 5000 --target 0.9
+    python spaced_sim.py --policies app,weakest_first --tiebreak stale --json sim.json
+"""
+
+import sys
+import json
+import time
+import argparse
+from math import comb
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from scheduler import BOX_MAX, BOX_MIN, box_table, priority_table, spaced_priority, update_box
+from data_extract.bank_io import read_bank
+
+ROOT = Path(__file__).parent
+DEFAULT_BANK = ROOT / "snowpro_questions.compiled.json"
+
+
+# ----- candidate policies (history dict -> priority, lower first) -----
+
+def weakest_first(history: Dict) -> int:
+    """Misses first, then new and low boxes before high boxes."""
+    if history.get("last_ok", None) is False:
+        return 0
+    return 1 + int(history.get("box", 0))
+
+
+def new_first(history: Dict) -> int:
+    """Unseen questions first, then misses, then by box."""
+    if "last_ok" not in history:
+        return 0
+    if history["last_ok"] is False:
+        return 1
+    return 2 + int(history.get("box", 0))
+
+
+def reset_on_miss(box: int, ok: bool) -> int:
+    """Classic Leitner: a miss sends the question back to the first box."""
+    return min(box + 1, BOX_MAX) if ok else BOX_MIN
+
+
+POLICIES = {
+    "app": (spaced_priority, update_box),
+    "weakest_first": (weakest_first, update_box),
+    "weakest_first_reset": (weakest_first, reset_on_miss),
+    "new_first": (new_first, update_box),
+    "app_reset": (spaced_priority, reset_on_miss),
+}
+
+
+def guess_rates(questions: List[Dict]) -> np.ndarray:
+    """Chance of answering each question right by guessing."""
+    rates = []
+    for q in questions:
+        n = q.get("n_choices") or sum(1 for lab in "ABCDEF" if str(q.get(lab) or "").strip())
+        k = max(len(q.get("correct") or []), 1)
+        rates.append(1.0 / comb(max(n, k), k))
+    return np.array(rates, dtype=np.float64)
+
+
+def simulate(guess: np.ndarray, priority_fn: Callable, box_fn: Callable, learners: int = 2000,
+             steps: int = 3000, target: float = 0.8, strength: float = 100.0, growth: float = 2.5,
+             prior: float = 0.1, cooldown: int = 10, tiebreak: str = "qnum",
+             check_every: int = 10, seed: int = 0) -> Dict:
+    """Run one policy; returns per-learner questions-to-mastery and summary stats."""
+    rng = np.random.default_rng(seed)
+    n_q = len(guess)
+    prio_table, step_table = priority_table(priority_fn), box_table(box_fn)
+    rows = np.arange(learners)
+
+    ability = rng.lognormal(0.0, 0.3, size=learners)[:, None]
+    studied = rng.random((learners, n_q)) < prior
+    s = np.where(studied, strength * growth, strength)
+    last = np.zeros((learners, n_q))
+    box = np.zeros((learners, n_q), dtype=np.int8)
+    last_ok = np.zeros((learners, n_q), dtype=np.int8)      # index into scheduler.LAST_OK_STATES
+    seen_at = np.zeros((learners, n_q))
+    mastered_at = np.full(learners, -1, dtype=np.int64)
+
+    # Ties are broken like the app (by qnum) or by least recently seen
+    order_key = np.arange(n_q, dtype=np.float64) / n_q
+
+    def sort_key(r, q):
+        tie = seen_at[r, q] / (steps + 1) if tiebreak == "stale" else order_key[q]
+        return prio_table[last_ok[r, q], box[r, q]] + tie
+
+    # Only the answered question's key changes per step, so the full key
+    # matrix is built once and patched; questions in cooldown are held at inf
+    key = sort_key(slice(None), slice(None))
+    recent = np.full((cooldown + 1, learners), -1, dtype=np.int64)
+
+    for t in range(1, steps + 1):
+        slot = t % (cooldown + 1)
+        if recent[slot, 0] >= 0:
+            key[rows, recent[slot]] = sort_key(rows, recent[slot])
+        pick = key.argmin(axis=1)
+
+        g = guess[pick]
+        recall = np.where(studied[rows, pick], np.exp(-(t - last[rows, pick]) / s[rows, pick]), 0.0)
+        ok = rng.random(learners) < recall + (1 - recall) * g
+
+        s[rows, pick] = np.where(ok, s[rows, pick] * growth * ability[:, 0],
+                                 np.maximum(s[rows, pick] * 0.5, strength))
+        studied[rows, pick] = True
+        last[rows, pick] = t
+        seen_at[rows, pick] = t
+        box[rows, pick] = step_table[box[rows, pick], ok.astype(np.int8)]
+        last_ok[rows, pick] = np.where(ok, 2, 1)
+        recent[slot] = pick
+        key[rows, pick] = np.inf
+
+        if t % check_every == 0:
+            retention = np.where(studied, np.exp(-(t - last) / s), 0.0).mean(axis=1)
+            newly = (retention >= target) & (mastered_at < 0)
+            mastered_at[newly] = t
+            if (mastered_at >= 0).all():
+                break
+
+    # Learners who never got there count as infinitely slow
+    done = np.where(mastered_at >= 0, mastered_at, np.inf)
+    finite = lambda v: float(v) if np.isfinite(v) else None
+    return {
+        "mastered_at": mastered_at,
+        "reached": float(np.isfinite(done).mean()),
+        "median": finite(np.quantile(done, 0.5, method="inverted_cdf")),
+        "p90": finite(np.quantile(done, 0.9, method="inverted_cdf")),
+    }
+
+
+def load_guess_rates(path: Path) -> np.ndarray:
+    questions = [q for q in read_bank(path) if q.get("correct")]
+    return guess_rates(questions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare spaced-repetition policies on simulated learners.")
+    parser.add_argument("--bank", type=Path, default=DEFAULT_BANK)
+    parser.add_argument("--policies", default=",".join(POLICIES),
+                        help=f"comma-separated subset of: {', '.join(POLICIES)}")
+    parser.add_argument("--learners", type=int, default=2000)
+    parser.add_argument("--steps", type=int, default=3000, help="max questions answered per learner")
+    parser.add_argument("--target", type=float, default=0.8, help="mean recall that counts as mastery")
+    parser.add_argument("--strength", type=float, default=100.0, help="initial memory strength, in questions")
+    parser.add_argument("--growth", type=float, default=2.5, help="strength multiplier on a correct answer")
+    parser.add_argument("--prior", type=float, default=0.1, help="share of questions known before studying")
+    parser.add_argument("--cooldown", type=int, default=10,
+                        help="a question is not shown again within this many steps")
+    parser.add_argument("--tiebreak", choices=["qnum", "stale"], default="qnum",
+                        help="order within a priority level: by qnum (as the app) or least recently seen")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="write the summary as JSON")
+    args = parser.parse_args()
+
+    if not args.bank.exists():
+        print(f"Error: {args.bank} not found!")
+        sys.exit(1)
+    names = [p.strip() for p in args.policies.split(",") if p.strip()]
+    unknown = [p for p in names if p not in POLICIES]
+    if unknown:
+        print(f"Error: unknown policies {unknown}; choose from {', '.join(POLICIES)}")
+        sys.exit(1)
+
+    guess = load_guess_rates(args.bank)
+    if not 0 <= args.cooldown < len(guess):
+        print(f"Error: --cooldown must be between 0 and {len(guess) - 1}")
+        sys.exit(1)
+    print(f"{len(guess)} questions, {args.learners} learners, up to {args.steps} steps, "
+          f"target recall {args.target:.0%}, tiebreak {args.tiebreak}\n")
+    print(f"{'policy':<22}{'reached':>9}{'median':>9}{'p90':>9}{'time':>8}")
+
+    summary = {}
+    for name in names:
+        t0 = time.perf_counter()
+        res = simulate(guess, *POLICIES[name], learners=args.learners, steps=args.steps,
+                       target=args.target, strength=args.strength, growth=args.growth,
+                       prior=args.prior, cooldown=args.cooldown, tiebreak=args.tiebreak,
+                       seed=args.seed)
+        elapsed = time.perf_counter() - t0
+        res.pop("mastered_at")
+        summary[name] = dict(res, seconds=round(elapsed, 2))
+        fmt = lambda v: "-" if v is None else f"{v:.0f}"
+        print(f"{name:<22}{res['reached']:>8.0%} {fmt(res['median']):>8} {fmt(res['p90']):>8} {elapsed:>6.1f}s")
+
+    ranked = sorted((n for n in summary if summary[n]["median"] is not None),
+                    key=lambda n: (summary[n]["median"], summary[n]["p90"] or np.inf))
+    if ranked:
+        print(f"\n✅ Best: {ranked[0]} (fewest questions to mastery)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"params": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+                       "policies": summary}, f, indent=2)
+        print(f"Saved summary to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Bank loading, grading and spaced ordering shared by the Streamlit app
+(snowpro_app.py) and the headless grading API (grading_api.py).
+Nothing here depends on Streamlit.
+"""
+
+import json
+import hashlib
+from pathlib import Path
+from typing import List, Dict, Tuple
+import pandas as pd
+
+from learner_history import History, letters_mask
+from data_extract.bank_io import BANK_SCHEMA_VERSION, read_bank, read_bank_header, read_bank_meta
+
+# Optional columnar bank (data_extract/export_parquet.py)
+try:
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except Exception:
+    PYARROW_AVAILABLE = False
+
+OPTION_LABELS = ["A","B","C","D","E","F"]
+# Columns the study UI reads; the columnar bank is loaded with this projection
+APP_COLUMNS = ["qnum", "question", *OPTION_LABELS, "correct", "multi"]
+
+def bank_files(data_path: Path) -> Tuple[Path, Path, Path]:
+    """(parquet, compiled, raw) files for a bank, e.g. snowpro_questions.json ->
+    snowpro_questions.parquet / snowpro_questions.compiled.json (data_extract/compile_bank.py)."""
+    stem = data_path.name.split(".")[0]
+    return (data_path.with_name(stem + ".parquet"),
+            data_path.with_name(stem + ".compiled.json"),
+            data_path)
+
+def parquet_meta(path: Path) -> Dict:
+    """Bank metadata stored in a Parquet file's schema (data_extract/export_parquet.py)."""
+    metadata = pq.read_schema(path).metadata or {}
+    return {k.decode(): json.loads(v) for k, v in metadata.items() if k != b"ARROW:schema"}
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _mtime(path: Path) -> int:
+    return path.stat().st_mtime_ns if path.exists() else -1
+
+def bank_version(bank: Dict) -> Tuple[str, int, int]:
+    """Cheap cache key for a bank on disk. Banks are replaced atomically
+    (data_extract/bank_io.py), so a new mtime/size means new content.
+
+    The compiled artifact is only picked while it is at least as new as the
+    raw bank; after an extractor or json_fixer.py rewrites the raw bank the
+    raw file is served until compile_bank.py runs again. The same goes for
+    the Parquet copy against both of them."""
+    parquet, compiled, raw = bank_files(Path(bank["path"]))
+    path = raw
+    if compiled.exists() and _mtime(compiled) >= _mtime(raw):
+        path = compiled
+    if PYARROW_AVAILABLE and _mtime(parquet) >= max(_mtime(compiled), _mtime(raw)):
+        path = parquet
+    stat = path.stat()
+    return str(path), stat.st_mtime_ns, stat.st_size
+
+def load_bank(bank: Dict, version: Tuple[str, int, int],
+              columns: Tuple[str, ...] = tuple(APP_COLUMNS)) -> pd.DataFrame:
+    """Load the bank file picked by bank_version(), falling back to the raw bank."""
+    path = Path(version[0])
+    parquet, compiled, raw = bank_files(Path(bank["path"]))
+    if path == parquet:
+        meta = parquet_meta(path)
+        # Same check as for the compiled bank below: the header says which
+        # compiled content (or raw file) the copy was exported from
+        if (meta.get("schema_version") == BANK_SCHEMA_VERSION
+                and (not compiled.exists()
+                     or meta.get("content_sha256") == read_bank_header(compiled).get("content_sha256"))
+                and (not raw.exists() or meta.get("source_sha256") == file_sha256(raw))):
+            # correct comes back as arrays of letters; join/sort/len all work on them
+            return pd.read_parquet(path, columns=list(columns))
+        path = compiled if compiled.exists() else raw
+    if path == compiled:
+        meta, data = read_bank_meta(path)
+        # mtimes don't survive every copy or checkout; the header records
+        # which raw bank the artifact was compiled from
+        if (meta.get("schema_version") == BANK_SCHEMA_VERSION
+                and (not raw.exists() or meta.get("source_sha256") == file_sha256(raw))):
+            return pd.DataFrame(data)
+    path = raw
+    # Fallback: raw extractor output, normalized here
+    # Accepts .json, .ndjson/.jsonl and their compressed variants
+    data = read_bank(path)
+    df = pd.DataFrame(data)
+    def norm(x):
+        if x is None:
+            return []
+        if isinstance(x, list):
+            return [str(y).upper() for y in x]
+        if isinstance(x, str):
+            return [c for c in x.upper() if c in "ABCDEF"]
+        return []
+    df["correct"] = df["correct"].apply(norm)
+    df = df.reindex(columns=list(dict.fromkeys([*df.columns, *OPTION_LABELS])))
+    df[OPTION_LABELS] = df[OPTION_LABELS].fillna("")
+    df["multi"] = df["correct"].apply(lambda xs: len(xs) > 1)
+    return df.sort_values("qnum").reset_index(drop=True)
+
+def make_card(row) -> Dict:
+    """Everything needed to show and grade one question: text, option labels, answer and feedback."""
+    qnum = int(row.qnum)
+    options = [f"{lab}. {str(getattr(row, lab, '') or '').strip()}" for lab in OPTION_LABELS
+               if str(getattr(row, lab, "") or "").strip()]
+    answer = [str(c) for c in row.correct]
+    answer_text = ", ".join(answer)
+    return {
+        "qnum": qnum,
+        "title": f"Q{qnum}",
+        "question": row.question,
+        "options": options,
+        "multi": bool(row.multi),
+        "correct": answer,
+        "mask": letters_mask(c for c in answer if c in OPTION_LABELS),
+        "answer_text": answer_text,
+        "check_label": f"Check Q{qnum}",
+        "correct_msg": f"✅ Correct. Answer: {answer_text}",
+        "answer_msg": f"Answer: {answer_text}",
+    }
+
+def build_cards(df: pd.DataFrame) -> Dict[int, Dict]:
+    """make_card for every question, keyed by position in the bank DataFrame (its index)."""
+    return {int(pos): make_card(row) for pos, row in zip(df.index, df.itertuples(index=False))}
+
+def to_labels(selected: List[str]) -> List[str]:
+    labs = []
+    for s in selected:
+        if isinstance(s, str) and len(s) > 1 and s[1] == ".":
+            labs.append(s[0].upper())
+    return labs
+
+def verdict(selected_labels: List[str], correct_labels: List[str]) -> bool:
+    return sorted(selected_labels) == sorted(correct_labels)
+
+def record_check(results: History, qnum: int, selected_labs: List[str], correct_labels) -> bool:
+    """Grade an answer and update the question's history (Leitner box, last pick)."""
+    ok = verdict(selected_labs, correct_labels)
+    results.record(qnum, selected_labs, ok)
+    return ok
+
+def build_spaced_order(df: pd.DataFrame, results: History) -> pd.DataFrame:
+    # Priority per question (scheduler.spaced_priority), looked up for all at once
+    df2 = df.assign(priority=results.priorities(df["qnum"].to_numpy()))
+    return df2.sort_values(["priority","qnum"])
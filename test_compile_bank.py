@@ -0,0 +1,60 @@
+"""
+Tests for keeping the compiled bank in step with its source
+(data_extract/compile_bank.py, data_extract/watch_bank.py) and for which
+artifact study_core.load_bank serves.
+
+Usage:
+    python -m pytest -q test_compile_bank.py
+"""
+
+import sys
+import json
+from pathlib import Path
+
+# The data_extract scripts import their siblings directly
+sys.path.insert(0, str(Path(__file__).parent / "data_extract"))
+
+from study_core import bank_files, bank_version, load_bank  # noqa: E402
+from watch_bank import BankBuilder  # noqa: E402
+
+QUESTIONS = [
+    {"qnum": 1, "question": "Topic 1 Which layer  stores data?", "A": "Storage", "B": "Compute",
+     "correct": "a"},
+    {"qnum": 2, "question": "Which are editions?", "A": "Standard", "B": "Enterprise", "C": "Tiny",
+     "correct": ["B", "A"]},
+]
+
+
+def build(tmp_path):
+    raw = tmp_path / "bank.json"
+    _, compiled, _ = bank_files(raw)
+    written, _ = BankBuilder(raw, tmp_path / "overlays", compiled).build()
+    return written, compiled
+
+
+def test_resaved_source_still_serves_compiled_bank(tmp_path):
+    raw = tmp_path / "bank.json"
+    raw.write_text(json.dumps(QUESTIONS, indent=2), encoding="utf-8")
+    assert build(tmp_path)[0]
+
+    # Same questions, different bytes (a reformat, or json_fixer re-saving
+    # it), and now newer than the artifact
+    raw.write_text(json.dumps(QUESTIONS, indent=4), encoding="utf-8")
+    written, compiled = build(tmp_path)
+    assert written
+
+    bank = {"path": str(raw)}
+    version = bank_version(bank)
+    assert version[0] == str(compiled)
+    df = load_bank(bank, version, columns=("qnum", "question", "correct", "hash"))
+    # Compiled records: repaired text, sorted answer lists and a content hash
+    assert df["question"].tolist() == ["Which layer stores data?", "Which are editions?"]
+    assert df["correct"].tolist() == [["A"], ["A", "B"]]
+    assert df["hash"].notna().all()
+
+
+def test_unchanged_source_leaves_artifact_alone(tmp_path):
+    raw = tmp_path / "bank.json"
+    raw.write_text(json.dumps(QUESTIONS), encoding="utf-8")
+    assert build(tmp_path)[0]
+    assert not build(tmp_path)[0]
@@ -0,0 +1,184 @@
+"""
+Tests for the learner progress formats: History buffers, learner state
+files (learner_store.py) and progress export files (progress_sync.py).
+
+Usage:
+    python -m pytest -q test_progress_sync.py
+"""
+
+import numpy as np
+import pytest
+
+from attempt_log import AttemptLog, iter_attempts
+from learner_history import History, letters_mask
+from learner_store import LearnerStore, decode_state, encode_state
+from progress_sync import export_progress, merge_attempts, merge_state, read_attempts, read_progress
+from scheduler import BOX_MAX, spaced_priority
+
+TS = 1792368000
+
+
+def sample_state():
+    core = History()
+    core.record(10, ["B", "D"], ok=False, ts=TS)
+    core.record(3, ["A"], ok=True, ts=TS + 5)
+    core.record(3, ["A"], ok=True, ts=TS + 9)
+    extra = History()
+    extra.record(250, ["F"], ok=True, ts=TS + 60)
+    return {"core": core, "snowpro-advanced ✓": extra}
+
+
+def sample_attempts(learner="alice"):
+    return [
+        {"ts": TS + 0.125, "learner": learner, "bank": "core", "qnum": 10, "selected": "BD", "ok": False},
+        {"ts": TS + 5.5, "learner": learner, "bank": "core", "qnum": 3, "selected": "A", "ok": True},
+        {"ts": TS + 86400.001, "learner": learner, "bank": "snowpro-advanced ✓", "qnum": 250,
+         "selected": "F", "ok": True},
+        {"ts": TS + 86401.0, "learner": learner, "bank": "core", "qnum": 7, "selected": "", "ok": False},
+    ]
+
+
+def assert_same_state(a, b):
+    assert a.keys() == b.keys()
+    for bank in a:
+        np.testing.assert_array_equal(a[bank].data, b[bank].data)
+
+
+# ----- encode / decode -----
+
+def test_history_bytes_round_trip():
+    hist = sample_state()["core"]
+    back = History.from_bytes(hist.to_bytes())
+    np.testing.assert_array_equal(back.data, hist.data)
+    assert back.get(10) == {"box": 0, "last_ok": False, "correct": False, "selected": ["B", "D"], "ts": TS}
+    assert back.get(3) == {"box": 2, "last_ok": True, "correct": True, "selected": ["A"], "ts": TS + 9}
+    assert back.get(4) is None
+
+
+def test_letters_mask_takes_single_letters_only():
+    assert letters_mask(["B", "D"]) == 0b1010
+    assert letters_mask("") == 0
+    for bad in (["AB"], [""], ["a"], ["G"], [["A"]]):
+        with pytest.raises(ValueError):
+            letters_mask(bad)
+
+
+def test_state_round_trip():
+    state = sample_state()
+    assert_same_state(decode_state(encode_state(state)), state)
+    assert decode_state(encode_state({})) == {}
+
+
+def test_export_round_trip():
+    state, attempts = sample_state(), sample_attempts()
+    data = export_progress([("alice", state, attempts), ("bob", {}, [])])
+    learners = list(read_progress(data))
+    assert [lid for lid, _, _ in learners] == ["alice", "bob"]
+    _, got_state, got_attempts = learners[0]
+    assert_same_state(got_state, state)
+    assert got_attempts == attempts
+    assert learners[1][1:] == ({}, [])
+
+
+def test_damaged_export_is_rejected():
+    data = export_progress([("alice", sample_state(), sample_attempts())])
+    with pytest.raises(ValueError):
+        list(read_progress(b"not an export"))
+    with pytest.raises(ValueError):
+        list(read_progress(data[:-4]))
+
+
+# ----- merging -----
+
+def test_merge_takes_newer_checks():
+    mine, theirs = History(), History()
+    mine.record(1, ["A"], ok=True, ts=TS + 10)
+    theirs.record(1, ["B"], ok=False, ts=TS + 20)
+    mine.record(2, ["A"], ok=True, ts=TS + 30)
+    theirs.record(2, ["B"], ok=False, ts=TS + 20)
+    assert mine.merge(theirs) == 1
+    assert mine.get(1)["selected"] == ["B"]
+    assert mine.get(2)["selected"] == ["A"]
+
+
+def test_merge_tie_keeps_this_side():
+    mine, theirs = History(), History()
+    mine.record(1, ["A"], ok=True, ts=TS)
+    theirs.record(1, ["B"], ok=False, ts=TS)
+    assert mine.merge(theirs) == 0
+    assert mine.get(1)["selected"] == ["A"]
+
+
+def test_merge_fills_unseen_and_ignores_unchecked():
+    mine, theirs = History(), History()
+    mine.record(1, ["A"], ok=True, ts=TS)
+    # Checked on the other side only, even with no timestamp: still taken
+    theirs.data = np.zeros(6, dtype=theirs.data.dtype)
+    theirs.data[5] = (2, 0x80 | 0x40, 0)
+    assert mine.merge(theirs) == 1
+    assert mine.get(5)["box"] == 2
+    assert mine.get(1)["selected"] == ["A"]
+    assert mine.merge(History()) == 0
+
+
+def test_merge_state_adds_missing_banks():
+    current = {"core": History()}
+    current["core"].record(1, ["A"], ok=True, ts=TS)
+    incoming = sample_state()
+    changed = merge_state(current, incoming)
+    assert changed == len(incoming["core"]) + len(incoming["snowpro-advanced ✓"])
+    assert set(current) == {"core", "snowpro-advanced ✓"}
+    assert current["core"].get(1)["selected"] == ["A"]
+
+
+# ----- import -----
+
+def import_file(data, store, log):
+    questions = appended = 0
+    for lid, incoming, records in read_progress(data):
+        state = store.get(lid)
+        questions += merge_state(state, incoming)
+        store.mark_dirty(lid, state)
+        appended += merge_attempts(log, records)
+    store.flush()
+    return questions, appended
+
+
+def test_reimport_is_idempotent(tmp_path):
+    data = export_progress([("alice", sample_state(), sample_attempts("alice")),
+                            ("bob", sample_state(), sample_attempts("bob"))])
+    store, log = LearnerStore(tmp_path / "state"), AttemptLog(tmp_path / "logs")
+    assert import_file(data, store, log) == (6, 8)
+    files = {p.name: p.read_bytes() for p in (tmp_path / "state").iterdir()}
+    records = list(iter_attempts(tmp_path / "logs"))
+
+    assert import_file(data, LearnerStore(tmp_path / "state"), AttemptLog(tmp_path / "logs")) == (0, 0)
+    assert {p.name: p.read_bytes() for p in (tmp_path / "state").iterdir()} == files
+    assert list(iter_attempts(tmp_path / "logs")) == records
+    assert read_attempts(tmp_path / "logs", {"alice"}) == {"alice": sample_attempts("alice")}
+
+
+# ----- scheduling -----
+
+def test_priorities_match_scheduler():
+    hist = History()
+    qnums = []
+    for box in range(BOX_MAX + 1):
+        for ok in (False, True):
+            qnum = len(qnums)
+            hist._reserve(qnum)
+            hist.data[qnum] = (box, 0x80 | (0x40 if ok else 0), TS)
+            qnums.append(qnum)
+        # never checked, but with a box left over
+        qnum = len(qnums)
+        hist._reserve(qnum)
+        hist.data[qnum] = (box, 0, 0)
+        qnums.append(qnum)
+    qnums.append(len(hist.data) + 10)   # past the end of the array
+    expected = []
+    for q in qnums:
+        h = hist.get(q)
+        if h is None:
+            h = {"box": int(hist.data["box"][q])} if q < len(hist.data) else {}
+        expected.append(spaced_priority(h))
+    assert hist.priorities(np.array(qnums)).tolist() == expected